@@ -6,7 +6,12 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[('icons', 'icons')],
-    hiddenimports=['PIL._tkinter_finder'],
+    hiddenimports=[
+        'PIL._tkinter_finder',
+        # модули, которые приложение импортирует лениво по имени
+        'auth', 'storage', 'journal', 'leaderboard', 'utils',
+        'game_screen', 'stats_screen', 'widgets', 'engine', 'ai',
+    ],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
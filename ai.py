@@ -0,0 +1,139 @@
+# модуль содержит стратегии ai и таблицы выигрышных позиций для них
+from config import BRICKS_GAME
+from engine import Rules
+
+
+class SolvedTable:
+    # таблица позиций 0..size-1: выигрышна ли позиция и какой ход в ней делать
+    __slots__ = ('rules', 'win', 'best')
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.win = bytearray()
+        self.best = []
+
+    def extend(self, size):
+        # досчитываем таблицу до нужного размера, не пересчитывая уже известное
+        moves = self.rules.moves
+        misere = self.rules.misere
+        win = self.win
+        best = self.best
+
+        for n in range(len(win), size):
+            legal = [m for m in moves if m <= n]
+            if not legal:
+                # ходов нет: в обычной игре это поражение, в мизере - победа
+                win.append(misere)
+                best.append(0)
+                continue
+
+            move = 0
+            for m in legal:
+                if not win[n - m]:
+                    move = m
+                    break
+
+            win.append(1 if move else 0)
+            # в проигрышной позиции берем минимум, чтобы затянуть партию
+            best.append(move or legal[0])
+
+    def __len__(self):
+        return len(self.win)
+
+
+# таблицы кэшируются на весь процесс для каждого набора правил
+_TABLES = {}
+
+
+def solve(rules, size):
+    """
+    Возвращает таблицу позиций для правил rules размером не меньше size.
+    Таблица строится один раз на набор правил и лишь дорастает при необходимости.
+    """
+    table = _TABLES.get(rules)
+    if table is None:
+        table = _TABLES[rules] = SolvedTable(rules)
+    if len(table) < size:
+        table.extend(size)
+    return table
+
+
+class RandomStrategy:
+    # прежнее поведение: добираем остаток целиком, иначе случайный допустимый ход
+    name = 'random'
+
+    def __init__(self, rules):
+        self.rules = rules
+
+    def choose(self, bricks_left, rng):
+        moves = self.rules.moves
+        if not self.rules.misere and bricks_left in moves:
+            return bricks_left
+
+        legal = [m for m in moves if m <= bricks_left]
+        return rng.choice(legal)
+
+
+class OptimalStrategy:
+    # идеальная игра: ход берется из заранее посчитанной таблицы за O(1)
+    name = 'optimal'
+
+    def __init__(self, rules, size=None):
+        self.rules = rules
+        self.table = solve(rules, (size or BRICKS_GAME['max_bricks']) + 1)
+
+    def choose(self, bricks_left, rng=None):
+        if bricks_left >= len(self.table):
+            self.table.extend(bricks_left * 2)
+        return self.table.best[bricks_left]
+
+
+class HeuristicStrategy:
+    # перебор на два полухода вперед, среди равных ходов выбираем случайный
+    name = 'heuristic'
+    depth = 2
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.candidates = []
+
+    def score(self, bricks_left, depth):
+        # оценка позиции для ходящего: 1 - выигрыш, -1 - проигрыш, 0 - неясно
+        legal = [m for m in self.rules.moves if m <= bricks_left]
+        if not legal:
+            return 1 if self.rules.misere else -1
+        if depth == 0:
+            return 0
+        return max(-self.score(bricks_left - m, depth - 1) for m in legal)
+
+    def extend(self, size):
+        # кандидаты считаются один раз на позицию, дальше ход - выбор из списка
+        for n in range(len(self.candidates), size):
+            legal = [m for m in self.rules.moves if m <= n]
+            if not legal:
+                self.candidates.append(())
+                continue
+            scores = [-self.score(n - m, self.depth - 1) for m in legal]
+            best = max(scores)
+            self.candidates.append(tuple(m for m, sc in zip(legal, scores) if sc == best))
+
+    def choose(self, bricks_left, rng):
+        if bricks_left >= len(self.candidates):
+            self.extend(max(bricks_left + 1, BRICKS_GAME['max_bricks'] + 1))
+        return rng.choice(self.candidates[bricks_left])
+
+
+STRATEGIES = {
+    RandomStrategy.name: RandomStrategy,
+    OptimalStrategy.name: OptimalStrategy,
+    HeuristicStrategy.name: HeuristicStrategy,
+}
+
+
+def make_strategy(name, rules=None):
+    # создаем стратегию по имени из конфигурации
+    try:
+        strategy_cls = STRATEGIES[name]
+    except KeyError:
+        raise ValueError(f"Неизвестная стратегия ai: {name}") from None
+    return strategy_cls(rules or Rules.from_config())
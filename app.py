@@ -1,14 +1,14 @@
 # главный модуль приложения управляет навигацией между экранами
 import customtkinter as ctk
-from config import COLORS, WINDOW_SIZES, get_base_dir
-from auth import AuthManager
+from config import COLORS, WINDOW_SIZES, STARTUP, ICON_CACHE, SCREENS, get_base_dir
+from lazy import load_module, prewarm, import_report
+from navigation import ScreenManager
 from screens import StartScreen, LoginScreen, RegisterScreen
-from game_screen import GameScreen
 
 
 class BricksGameApp(ctk.CTk):
     # главное окно приложения с системой навигации
-    def __init__(self):
+    def __init__(self, users_file=None):
         super().__init__()
         
         # настройка темы
@@ -36,91 +36,130 @@ class BricksGameApp(ctk.CTk):
         except Exception:
             pass
         
-        # инициализация менеджера авторизации
-        self.auth_manager = AuthManager()
+        # менеджер авторизации (и чтение пользователей) создается лениво
+        self.users_file = users_file
+        self._auth_manager = None
         
         # контейнер для экранов
         self.container = ctk.CTkFrame(self, fg_color="transparent")
         self.container.pack(fill="both", expand=True)
         
-        # словарь экранов
-        self.screens = {}
+        # экраны создаются один раз и при навигации только прячутся и показываются
+        self.screens = ScreenManager(self.container, max_widgets=SCREENS['max_widgets'])
+        self.screens.register('start', lambda: StartScreen(self.container, self.show_login_screen))
+        self.screens.register('login', lambda: LoginScreen(
+            self.container,
+            self.handle_login,
+            self.show_register_screen
+        ))
+        self.screens.register('register', lambda: RegisterScreen(
+            self.container,
+            self.handle_register,
+            self.show_login_screen
+        ))
+        self.screens.register('game', self.create_game_screen)
         
-        # показываем стартовый экран
-        self.show_start_screen()
+        # закрытие окна крестиком проходит через тот же выход, что и кнопка
+        self.protocol("WM_DELETE_WINDOW", self.handle_exit)
+        
+        # показываем стартовый экран, остальное подгружаем в фоне
+        start_screen = self.show_start_screen()
+        prewarm(
+            self,
+            [lambda: self.prewarm_icons(start_screen), *STARTUP['prewarm'], self.load_auth_manager],
+            delay=STARTUP['prewarm_delay']
+        )
+    
+    @property
+    def auth_manager(self):
+        # при быстром переходе к входу менеджер создается раньше прогрева
+        if self._auth_manager is None:
+            self.load_auth_manager()
+        return self._auth_manager
+    
+    def prewarm_icons(self, start_screen):
+        # иконки растеризуются в потоках, стартовый экран получает свою по готовности
+        IconLoader = load_module('utils').IconLoader
+        IconLoader.prewarm(
+            self,
+            ICON_CACHE['prewarm'],
+            workers=ICON_CACHE['prewarm_workers'],
+            on_done=start_screen.load_icon
+        )
     
-    def clear_container(self):
-        # очищаем контейнер от текущего экрана
-        for widget in self.container.winfo_children():
-            widget.destroy()
+    def load_auth_manager(self):
+        if self._auth_manager is None:
+            self._auth_manager = load_module('auth').AuthManager(self.users_file)
     
     def show_start_screen(self):
         # показываем стартовый экран
-        self.clear_container()
-        screen = StartScreen(self.container, self.show_login_screen)
-        screen.pack(fill="both", expand=True)
+        return self.screens.show('start')
     
     def show_login_screen(self):
         # показываем экран авторизации
-        self.clear_container()
-        screen = LoginScreen(
-            self.container,
-            self.handle_login,
-            self.show_register_screen
-        )
-        screen.pack(fill="both", expand=True)
+        self.screens.show('login')
     
     def show_register_screen(self):
         # показываем экран регистрации
-        self.clear_container()
-        screen = RegisterScreen(
-            self.container,
-            self.handle_register,
-            self.show_login_screen
-        )
-        screen.pack(fill="both", expand=True)
+        self.screens.show('register')
     
-    def show_game_screen(self):
-        # показываем игровой экран
-        self.clear_container()
-        screen = GameScreen(
+    def create_game_screen(self):
+        GameScreen = load_module('game_screen').GameScreen
+        return GameScreen(
             self.container,
             self.auth_manager,
             self.handle_logout,
             self.handle_exit
         )
-        screen.pack(fill="both", expand=True)
+    
+    def show_game_screen(self):
+        # показываем игровой экран
+        self.screens.show('game')
     
     def handle_login(self, login, password):
-        # обработка попытки входа
-        success, message = self.auth_manager.login_user(login, password)
+        # обработка попытки входа: пароль проверяется в фоне, окно не замирает
+        screen = self.screens.visible('login')
+        if screen:
+            screen.set_busy(True)
+        self.auth_manager.login_user_async(self, self.on_login_result, login, password)
+    
+    def on_login_result(self, success, message):
+        # результат входа приходит в поток tk
+        screen = self.screens.visible('login')
+        if screen is None:
+            # пока шла проверка, открыт другой экран
+            if success:
+                self.auth_manager.logout_user()
+            return
         
         if success:
             self.show_game_screen()
         else:
             # показываем ошибку на экране авторизации
-            for widget in self.container.winfo_children():
-                if isinstance(widget, LoginScreen):
-                    widget.show_error(message)
-                    break
+            screen.set_busy(False)
+            screen.show_error(message)
     
     def handle_register(self, login, password, email, gender, age_category):
-        # обработка регистрации нового пользователя
-        success, message = self.auth_manager.register_user(
+        # обработка регистрации нового пользователя (хеш пароля считается в фоне)
+        screen = self.screens.visible('register')
+        if screen:
+            screen.set_busy(True)
+        self.auth_manager.register_user_async(
+            self,
+            lambda success, message: self.on_register_result(login, success, message),
             login, password, email, gender, age_category
         )
-        
-        if success:
-            # автоматически входим в аккаунт после регистрации
-            self.auth_manager.login_user(login, password)
+    
+    def on_register_result(self, login, success, message):
+        screen = self.screens.visible('register')
+        if success and screen is not None:
+            # автоматически входим в аккаунт после регистрации, пароль уже проверен
+            self.auth_manager.start_session(login)
             self.show_game_screen()
-        else:
+        elif screen is not None:
             # показываем ошибку на экране регистрации
-            # ищем текущий экран регистрации в контейнере
-            for widget in self.container.winfo_children():
-                if isinstance(widget, RegisterScreen):
-                    widget.show_error(message)
-                    break
+            screen.set_busy(False)
+            screen.show_error(message)
     
     def handle_logout(self):
         # обработка выхода из аккаунта
@@ -128,7 +167,10 @@ class BricksGameApp(ctk.CTk):
         self.show_login_screen()
     
     def handle_exit(self):
-        # закрытие приложения
+        # закрытие приложения: сначала дописываем отложенные изменения пользователей
+        if self._auth_manager is not None:
+            self._auth_manager.flush()
+            self._auth_manager.close()
         self.destroy()
 
 
@@ -136,6 +178,9 @@ def main():
     # точка входа в приложение
     app = BricksGameApp()
     app.mainloop()
+    
+    if STARTUP['import_report']:
+        print(import_report())
 
 
 if __name__ == "__main__":
@@ -1,10 +1,14 @@
 # модуль управляет авторизацией, регистрацией и хранением пользователей
 import os
-import json
 import re
 from datetime import datetime
 from pathlib import Path
-from config import get_base_dir
+from concurrent.futures import ThreadPoolExecutor
+from config import STORAGE, SECURITY, get_base_dir
+from passwords import hash_password, check_password
+from background import run_in_background
+from storage import create_storage, is_sqlite_path, migrate_json_to_sqlite, migrate_to_shards
+from snapshot import is_binary_path, convert as convert_snapshot
 
 
 def get_users_file_path(filename: str = 'users.json') -> str:
@@ -26,32 +30,60 @@ def get_users_file_path(filename: str = 'users.json') -> str:
 
 class AuthManager:
     # класс отвечает за работу с пользователями и их данными
-    def __init__(self, users_file: str | None = None):
+    def __init__(self, users_file: str | None = None, storage_mode: str | None = None):
+        # режим хранения: явный аргумент, расширение файла или ключ конфигурации
+        if storage_mode is None:
+            storage_mode = 'sqlite' if is_sqlite_path(users_file) else STORAGE['mode']
+        self.storage_mode = storage_mode
+        
         # вычисляем путь к файлу с пользователями
-        self.users_file = users_file or get_users_file_path()
-        self.users = self.load_users()
+        if users_file is None:
+            if storage_mode == 'sqlite':
+                filename = STORAGE['sqlite_file']
+            elif storage_mode == 'sharded':
+                filename = STORAGE['shard_dir']
+            elif STORAGE['snapshot_format'] == 'binary':
+                filename = STORAGE['binary_file']
+            else:
+                filename = 'users.json'
+            users_file = get_users_file_path(filename)
+        self.users_file = users_file
+        
+        # при первом запуске в новом формате переносим пользователей из соседнего users.json
+        shard_extension = '.bin' if STORAGE['snapshot_format'] == 'binary' else '.json'
+        legacy_file = os.path.join(os.path.dirname(users_file), 'users.json')
+        if not os.path.exists(users_file) and os.path.exists(legacy_file):
+            if storage_mode == 'sqlite':
+                migrate_json_to_sqlite(legacy_file, users_file, STORAGE['journal_suffix'])
+            elif storage_mode == 'sharded':
+                migrate_to_shards(legacy_file, users_file, STORAGE['shards'], shard_extension, STORAGE['journal_suffix'])
+            elif is_binary_path(users_file):
+                convert_snapshot(legacy_file, users_file, STORAGE['journal_suffix'])
+        
+        self.storage = create_storage(
+            users_file,
+            storage_mode,
+            journal_suffix=STORAGE['journal_suffix'],
+            compact_threshold=STORAGE['compact_threshold'],
+            write_behind=STORAGE['write_behind'],
+            write_delay=STORAGE['write_delay'],
+            shards=STORAGE['shards'],
+            max_loaded_shards=STORAGE['max_loaded_shards'],
+            extension=shard_extension
+        )
+        self.load_users()
         self.current_user = None
+        
+        # пул для хеширования паролей создается при первом входе
+        self.executor = None
     
     def load_users(self):
-        # загружаем список пользователей из json файла
-        if os.path.exists(self.users_file):
-            try:
-                with open(self.users_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"Ошибка загрузки пользователей: {e}")
-                return {}
-        return {}
+        # загружаем пользователей через выбранное хранилище
+        return self.storage.load()
     
     def save_users(self):
         # сохраняем данные всех пользователей в файл
-        try:
-            with open(self.users_file, 'w', encoding='utf-8') as f:
-                json.dump(self.users, f, ensure_ascii=False, indent=2)
-            return True
-        except Exception as e:
-            print(f"Ошибка сохранения пользователей: {e}")
-            return False
+        return self.storage.save()
     
     def validate_email(self, email):
         # проверяем корректность формата email адреса
@@ -66,28 +98,42 @@ class AuthManager:
         # проверяем корректность логина
         return len(login) >= 3 and login.isalnum()
     
-    def register_user(self, login, password, email, gender, age_category):
-        # регистрируем нового пользователя с валидацией данных
+    def check_registration(self, login, password, email):
+        # проверяем данные регистрации; возвращаем текст ошибки или None
         
         # валидация логина
         if not self.validate_login(login):
-            return False, "Логин должен содержать минимум 3 символа (только буквы и цифры)"
+            return "Логин должен содержать минимум 3 символа (только буквы и цифры)"
         
-        # проверка на существование пользователя
-        if login in self.users:
-            return False, "Пользователь с таким логином уже существует"
+        # проверка на существование пользователя (логины различаются без учета регистра)
+        if self.storage.find_login(login):
+            return "Пользователь с таким логином уже существует"
         
         # валидация пароля
         if not self.validate_password(password):
-            return False, "Пароль должен содержать минимум 4 символа"
+            return "Пароль должен содержать минимум 4 символа"
         
         # валидация email
         if not self.validate_email(email):
-            return False, "Некорректный формат email (должен быть xxx@xxx.x)"
+            return "Некорректный формат email (должен быть xxx@xxx.x)"
+        
+        # один email - один аккаунт
+        if self.storage.find_email(email):
+            return "Пользователь с таким email уже существует"
+        
+        return None
+    
+    def add_user(self, login, password_hash, email, gender, age_category):
+        # создаем запись нового пользователя с уже посчитанным хешем пароля
+        
+        # логин или email могли занять, пока в фоне считался хеш
+        if self.storage.find_login(login):
+            return False, "Пользователь с таким логином уже существует"
+        if self.storage.find_email(email):
+            return False, "Пользователь с таким email уже существует"
         
-        # создаем запись нового пользователя
-        self.users[login] = {
-            'password': password,
+        record = {
+            'password': password_hash,
             'email': email,
             'gender': gender,
             'age_category': age_category,
@@ -100,22 +146,117 @@ class AuthManager:
         }
         
         # сохраняем данные в файл
-        if self.save_users():
+        if self.storage.add(login, record):
             return True, "Регистрация успешна!"
         else:
             return False, "Ошибка сохранения данных"
     
+    def register_user(self, login, password, email, gender, age_category):
+        # регистрируем нового пользователя с валидацией данных
+        error = self.check_registration(login, password, email)
+        if error:
+            return False, error
+        
+        return self.add_user(login, hash_password(password), email, gender, age_category)
+    
+    def register_user_async(self, widget, callback, login, password, email, gender, age_category):
+        """
+        Регистрация без блокировки интерфейса: проверки выполняются сразу,
+        хеш пароля считается в фоновом потоке, запись добавляется в потоке tk.
+        callback(успех, сообщение) вызывается в потоке tk.
+        """
+        error = self.check_registration(login, password, email)
+        if error:
+            callback(False, error)
+            return
+        
+        def work():
+            try:
+                return hash_password(password)
+            except Exception as e:
+                print(f"Ошибка хеширования пароля: {e}")
+                return None
+        
+        def done(password_hash):
+            if password_hash is None:
+                callback(False, "Ошибка сохранения данных")
+                return
+            callback(*self.add_user(login, password_hash, email, gender, age_category))
+        
+        run_in_background(widget, work, callback=done, executor=self.get_executor())
+    
+    def resolve_login(self, login):
+        # логин в написании, с которым пользователь зарегистрирован, или None
+        if self.storage.exists(login):
+            return login
+        return self.storage.find_login(login)
+    
+    def find_user_by_email(self, email):
+        # пара (логин, данные) владельца email или None
+        login = self.storage.find_email(email)
+        if login is None:
+            return None
+        return login, self.storage.get(login)
+    
     def login_user(self, login, password):
-        # авторизуем пользователя по логину и паролю
-        if login not in self.users:
+        # авторизуем пользователя по логину (без учета регистра) и паролю
+        login = self.resolve_login(login)
+        user_data = self.storage.get(login) if login else None
+        if user_data is None:
             return False, "Пользователь не найден"
         
-        if self.users[login]['password'] != password:
+        ok, new_hash = check_password(password, user_data['password'])
+        return self.finish_login(login, ok, new_hash)
+    
+    def login_user_async(self, widget, callback, login, password):
+        """
+        Вход без блокировки интерфейса: запись читается сразу, а проверка
+        пароля (десятки миллисекунд pbkdf2) идет в фоновом потоке.
+        callback(успех, сообщение) вызывается в потоке tk.
+        """
+        login = self.resolve_login(login)
+        user_data = self.storage.get(login) if login else None
+        if user_data is None:
+            callback(False, "Пользователь не найден")
+            return
+        
+        stored = user_data['password']
+        
+        def work():
+            try:
+                return check_password(password, stored)
+            except Exception as e:
+                print(f"Ошибка проверки пароля: {e}")
+                return False, None
+        
+        def done(result):
+            callback(*self.finish_login(login, *result))
+        
+        run_in_background(widget, work, callback=done, executor=self.get_executor())
+    
+    def finish_login(self, login, ok, new_hash):
+        # завершаем вход; старую запись (открытый текст или другая стоимость) перехешируем
+        if not ok:
             return False, "Неверный пароль"
         
-        self.current_user = login
+        if new_hash is not None:
+            self.storage.set_password(login, new_hash)
+        
+        self.start_session(login)
         return True, "Авторизация успешна!"
     
+    def start_session(self, login):
+        # делаем пользователя текущим (после проверенного входа или регистрации)
+        self.current_user = login
+    
+    def get_executor(self):
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(
+                max_workers=SECURITY['hash_workers'],
+                thread_name_prefix="password-hash"
+            )
+        return self.executor
+    
     def logout_user(self):
         # выходим из текущей сессии
         self.current_user = None
@@ -123,7 +264,7 @@ class AuthManager:
     def get_current_user(self):
         # возвращаем данные текущего пользователя
         if self.current_user:
-            return self.users.get(self.current_user)
+            return self.storage.get(self.current_user)
         return None
     
     def get_current_username(self):
@@ -135,33 +276,38 @@ class AuthManager:
         if not self.current_user:
             return False
         
-        user_data = self.users[self.current_user]
-        user_data['stats']['games'] += 1
-        
-        if result == 'win':
-            user_data['stats']['wins'] += 1
-        elif result == 'loss':
-            user_data['stats']['losses'] += 1
-        
-        return self.save_users()
+        return self.storage.record_result(self.current_user, result)
     
-    def get_leaderboard(self):
-        # получаем отсортированную таблицу лидеров
-        leaderboard = []
-        
-        for login, data in self.users.items():
-            stats = data['stats']
-            winrate = (stats['wins'] / stats['games'] * 100) if stats['games'] > 0 else 0
-            
-            leaderboard.append({
-                'login': login,
-                'games': stats['games'],
-                'wins': stats['wins'],
-                'losses': stats['losses'],
-                'winrate': winrate
-            })
-        
-        # сортируем по количеству побед (по убыванию)
-        leaderboard.sort(key=lambda x: x['wins'], reverse=True)
-        
-        return leaderboard
\ No newline at end of file
+    def get_leaderboard(self, offset=0, limit=None, sort_by='wins'):
+        # получаем страницу отсортированной таблицы лидеров (по умолчанию по победам)
+        return self.storage.leaderboard(offset, limit, sort_by)
+    
+    def top(self, k):
+        # первые k игроков таблицы лидеров
+        return self.storage.leaderboard(0, k)
+    
+    def get_leaderboard_size(self):
+        # количество строк в таблице лидеров
+        return self.storage.count()
+    
+    def search_players(self, prefix, offset=0, limit=None):
+        # страница игроков с логином на prefix (без учета регистра) в порядке таблицы лидеров
+        if not prefix:
+            return self.get_leaderboard(offset, limit)
+        return self.storage.search(prefix, offset, limit)
+    
+    def count_players(self, prefix):
+        # число игроков, найденных по префиксу
+        if not prefix:
+            return self.get_leaderboard_size()
+        return self.storage.search_count(prefix)
+    
+    def flush(self):
+        # дописываем на диск изменения, ожидающие фоновой записи
+        return self.storage.flush()
+    
+    def close(self):
+        # освобождаем файлы и соединения хранилища
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+        self.storage.close()
@@ -0,0 +1,42 @@
+# модуль выполняет долгие функции в фоновых потоках и возвращает результат в поток tk
+from concurrent.futures import ThreadPoolExecutor
+
+
+# общий пул для задач, которым не передан свой
+_executor = None
+
+# как часто поток tk проверяет готовность задачи, мс
+POLL_INTERVAL = 15
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="background")
+    return _executor
+
+
+def run_in_background(widget, func, *args, callback=None, executor=None):
+    """
+    Запускает func(*args) в пуле потоков и не блокирует цикл tk.
+    Готовность проверяется таймером widget.after, поэтому callback(результат)
+    вызывается в потоке tk и может менять виджеты.
+    Если func завершилась исключением, ошибка печатается, а callback не вызывается.
+    """
+    future = (executor or get_executor()).submit(func, *args)
+
+    def poll():
+        if not future.done():
+            widget.after(POLL_INTERVAL, poll)
+            return
+
+        try:
+            result = future.result()
+        except Exception as e:
+            print(f"Ошибка фоновой задачи: {e}")
+            return
+        if callback:
+            callback(result)
+
+    widget.after(POLL_INTERVAL, poll)
+    return future
@@ -0,0 +1,472 @@
+# модуль замеряет время ключевых операций приложения и сравнивает его с базовой линией
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+from datetime import datetime
+
+
+# зарегистрированные замеры: имя -> (функция, нужен ли дисплей для tk)
+CASES = {}
+
+DEFAULT_SIZES = [100, 1000, 10000, 100000]
+
+
+def case(name, tk=False):
+    # декоратор регистрирует замер в наборе
+    def register(func):
+        CASES[name] = (func, tk)
+        return func
+    return register
+
+
+def summarize(samples):
+    # сводка по замерам в миллисекундах
+    samples = [s * 1000 for s in samples]
+    return {
+        'min': round(min(samples), 4),
+        'median': round(statistics.median(samples), 4),
+        'mean': round(statistics.fmean(samples), 4),
+        'runs': len(samples)
+    }
+
+
+def measure(func, repeat=5, warmup=1):
+    # прогреваем и затем замеряем func repeat раз
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+def make_users(count, seed=0):
+    # синтетические пользователи в формате users.json
+    rng = random.Random(seed)
+    users = {}
+    for i in range(count):
+        games = rng.randint(0, 200)
+        wins = rng.randint(0, games)
+        users[f"user{i}"] = {
+            'password': f"pass{i}",
+            'email': f"user{i}@example.com",
+            'gender': rng.choice(['Мужской', 'Женский']),
+            'age_category': rng.choice(['до 18', '18-25', '26-40', '40+']),
+            'stats': {'games': games, 'wins': wins, 'losses': games - wins},
+            'created_at': "2024-01-01 12:00:00"
+        }
+    return users
+
+
+class BenchContext:
+    # общие параметры запуска и кэш подготовленных файлов пользователей
+    def __init__(self, workdir, sizes, modes, repeat):
+        self.workdir = workdir
+        self.sizes = sizes
+        self.modes = modes
+        self.repeat = repeat
+        self._files = {}
+
+    def users_file(self, size, mode='json'):
+        # файл с size пользователями; для sqlite получается миграцией из json
+        key = (size, mode)
+        if key in self._files:
+            return self._files[key]
+
+        json_file = os.path.join(self.workdir, f"users_{size}.json")
+        if not os.path.exists(json_file):
+            with open(json_file, 'w', encoding='utf-8') as f:
+                json.dump(make_users(size), f, ensure_ascii=False, indent=2)
+
+        path = json_file
+        if mode == 'sqlite':
+            from storage import migrate_json_to_sqlite
+            path = os.path.join(self.workdir, f"users_{size}.db")
+            migrate_json_to_sqlite(json_file, path)
+        elif mode == 'binary':
+            from snapshot import convert
+            path = os.path.join(self.workdir, f"users_{size}.bin")
+            convert(json_file, path)
+        elif mode == 'sharded':
+            from storage import migrate_to_shards
+            path = os.path.join(self.workdir, f"users_{size}_shards")
+            migrate_to_shards(json_file, path)
+        elif mode == 'journal':
+            path = os.path.join(self.workdir, f"users_{size}_journal.json")
+            shutil.copyfile(json_file, path)
+
+        self._files[key] = path
+        return path
+
+    def auth_manager(self, size, mode='json'):
+        from auth import AuthManager
+        return AuthManager(self.users_file(size, mode), storage_mode=storage_mode(mode))
+
+
+def storage_mode(mode):
+    # бинарный снапшот - то же json-хранилище, формат выбирается по расширению файла
+    return 'json' if mode == 'binary' else mode
+
+
+@case('auth.persistence')
+def bench_persistence(ctx):
+    # загрузка (создание AuthManager), изменение и сохранение пользователей
+    results = {}
+    from auth import AuthManager
+    for mode in ctx.modes:
+        for size in ctx.sizes:
+            path = ctx.users_file(size, mode)
+            repeat = ctx.repeat if size < 100000 else 2
+
+            def open_close():
+                AuthManager(path, storage_mode=storage_mode(mode)).close()
+
+            results[f"auth.load_users[{mode},{size}]"] = measure(open_close, repeat)
+
+            manager = AuthManager(path, storage_mode=storage_mode(mode))
+            manager.current_user = 'user0'
+
+            # задержка в потоке интерфейса и полное время до записи на диск
+            results[f"auth.update_user_stats[{mode},{size}]"] = measure(
+                lambda: manager.update_user_stats('win'), ctx.repeat * 4)
+            manager.flush()
+
+            def save():
+                manager.update_user_stats('win')
+                manager.save_users()
+
+            results[f"auth.save_users[{mode},{size}]"] = measure(save, repeat)
+            manager.close()
+    return results
+
+
+@case('auth.leaderboard')
+def bench_leaderboard(ctx):
+    # страница таблицы лидеров из середины, первые 10, весь список целиком и поиск игроков
+    results = {}
+    for mode in ctx.modes:
+        for size in ctx.sizes:
+            manager = ctx.auth_manager(size, mode)
+            middle = size // 2
+            results[f"auth.get_leaderboard.page[{mode},{size}]"] = measure(
+                lambda: manager.get_leaderboard(middle, 50), ctx.repeat * 4)
+            results[f"auth.get_leaderboard.top[{mode},{size}]"] = measure(
+                lambda: manager.top(10), ctx.repeat * 4)
+            results[f"auth.get_leaderboard.full[{mode},{size}]"] = measure(
+                manager.get_leaderboard, ctx.repeat if size < 100000 else 2)
+
+            # поиск по префиксу, как после паузы в наборе: число найденных и первая страница
+            # (префиксы чередуются, чтобы не попадать в запомненный результат)
+            prefixes = ['user1', 'user2']
+
+            def search():
+                prefixes.reverse()
+                manager.count_players(prefixes[0])
+                manager.search_players(prefixes[0], 0, 50)
+
+            results[f"auth.search_players[{mode},{size}]"] = measure(search, ctx.repeat * 4)
+            manager.close()
+    return results
+
+
+@case('auth.password')
+def bench_password(ctx):
+    # стоимость хеширования и проверки пароля при текущем числе итераций
+    from config import SECURITY
+    from passwords import hash_password, check_password
+    stored = hash_password('secret')
+    iterations = SECURITY['password_iterations']
+    return {
+        f"auth.hash_password[{iterations}]": measure(lambda: hash_password('secret'), ctx.repeat),
+        f"auth.check_password[{iterations}]": measure(lambda: check_password('secret', stored), ctx.repeat),
+        # вход со старым паролем открытым текстом: проверка и перехеширование
+        f"auth.check_password.legacy[{iterations}]": measure(lambda: check_password('secret', 'secret'), ctx.repeat)
+    }
+
+
+def child_startup(users_file):
+    # запускается в отдельном процессе: холодный старт до первого кадра
+    started = time.perf_counter()
+    import app
+    imported = time.perf_counter()
+
+    # отдельный файл пользователей, чтобы не трогать users.json проекта
+    window = app.BricksGameApp(users_file)
+    window.update()
+    first_frame = time.perf_counter()
+    window.destroy()
+
+    print(json.dumps({'import': imported - started, 'first_frame': first_frame - started}))
+
+
+@case('app.cold_start', tk=True)
+def bench_cold_start(ctx):
+    # каждый запуск - новый интерпретатор, чтобы кэши модулей не искажали замер
+    users_file = ctx.users_file(ctx.sizes[0])
+    wall, imports, first_frame = [], [], []
+    for _ in range(ctx.repeat):
+        started = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--child-startup', users_file],
+            capture_output=True, text=True, check=True
+        ).stdout
+        wall.append(time.perf_counter() - started)
+        data = json.loads(output.strip().splitlines()[-1])
+        imports.append(data['import'])
+        first_frame.append(data['first_frame'])
+    return {
+        'app.cold_start.process': summarize(wall),
+        'app.cold_start.imports': summarize(imports),
+        'app.cold_start.first_frame': summarize(first_frame)
+    }
+
+
+@case('app.navigation', tk=True)
+def bench_navigation(ctx):
+    # переход вход -> регистрация -> вход -> игра до готовой раскладки, экраны уже в кэше
+    import app
+
+    window = app.BricksGameApp(ctx.users_file(ctx.sizes[0]))
+    try:
+        window.auth_manager.start_session('user0')
+        window.update()
+
+        def navigate():
+            for show in (window.show_login_screen, window.show_register_screen,
+                         window.show_login_screen, window.show_game_screen):
+                show()
+                window.update_idletasks()
+
+        return {'app.navigation.round_trip': measure(navigate, ctx.repeat)}
+    finally:
+        window.handle_exit()
+
+
+@case('game.render_brick_wall', tk=True)
+def bench_brick_wall(ctx):
+    # отрисовка стены после каждого хода: от полной кучи до последнего кирпича
+    import customtkinter as ctk
+    from config import BRICKS_GAME
+    from game_screen import GameScreen
+
+    root = ctk.CTk()
+    try:
+        manager = ctx.auth_manager(ctx.sizes[0])
+        screen = GameScreen(root, manager, lambda: None, lambda: None)
+        screen.pack(fill="both", expand=True)
+        root.update()
+
+        state = screen.engine.state
+        samples = []
+        for _ in range(ctx.repeat):
+            screen.engine.new_game(BRICKS_GAME['max_bricks'])
+            root.update()
+            while state.bricks_left > 0:
+                state.bricks_left -= 1
+                started = time.perf_counter()
+                screen.render_brick_wall()
+                root.update_idletasks()
+                samples.append(time.perf_counter() - started)
+        manager.close()
+        return {'game.render_brick_wall.per_move': summarize(samples)}
+    finally:
+        root.destroy()
+
+
+@case('game.move', tk=True)
+def bench_game_move(ctx):
+    # полный ход на экране: событие движка и одна перерисовка по накопленным изменениям
+    import customtkinter as ctk
+    from config import BRICKS_GAME
+    from engine import AI
+    from game_screen import GameScreen
+
+    root = ctk.CTk()
+    try:
+        manager = ctx.auth_manager(ctx.sizes[0])
+        screen = GameScreen(root, manager, lambda: None, lambda: None)
+        screen.pack(fill="both", expand=True)
+        root.update()
+
+        engine = screen.engine
+        samples = []
+        for _ in range(ctx.repeat):
+            engine.new_game(BRICKS_GAME['max_bricks'])
+            root.update()
+            while engine.state.active:
+                started = time.perf_counter()
+                if engine.state.turn == AI:
+                    engine.ai_move()
+                else:
+                    engine.player_move(engine.legal_moves()[0])
+                root.update_idletasks()
+                samples.append(time.perf_counter() - started)
+        manager.close()
+        return {'game.move.per_move': summarize(samples)}
+    finally:
+        root.destroy()
+
+
+@case('stats.construct', tk=True)
+def bench_stats_screen(ctx):
+    # создание окна таблицы лидеров до готовой раскладки
+    import customtkinter as ctk
+    from stats_screen import StatsScreen
+
+    root = ctk.CTk()
+    results = {}
+    try:
+        for mode in ctx.modes:
+            for size in ctx.sizes:
+                manager = ctx.auth_manager(size, mode)
+
+                def construct():
+                    window = StatsScreen(root, manager)
+                    window.update_idletasks()
+                    window.destroy()
+
+                results[f"stats.construct[{mode},{size}]"] = measure(construct, ctx.repeat)
+                manager.close()
+        return results
+    finally:
+        root.destroy()
+
+
+def tk_unavailable():
+    # причина, по которой tk недоступен (например, нет дисплея), или None
+    try:
+        import tkinter
+        root = tkinter.Tk()
+        root.destroy()
+        return None
+    except Exception as e:
+        return str(e)
+
+
+def run_suite(ctx, names):
+    # выполняем выбранные замеры; tk-замеры без дисплея пропускаются с причиной
+    results = {}
+    skipped = {}
+    tk_error = None
+    tk_checked = False
+
+    for name in names:
+        func, needs_tk = CASES[name]
+        if needs_tk:
+            if not tk_checked:
+                tk_error = tk_unavailable()
+                tk_checked = True
+            if tk_error:
+                skipped[name] = tk_error
+                continue
+        print(f"... {name}", file=sys.stderr)
+        results.update(func(ctx))
+    return results, skipped
+
+
+def compare(results, baseline, threshold):
+    # сравниваем медианы с базовой линией; регрессия - рост больше threshold
+    rows = []
+    for name, current in sorted(results.items()):
+        base = baseline.get(name)
+        if base is None:
+            rows.append((name, None, current['median'], None, 'new'))
+            continue
+        ratio = current['median'] / base['median'] if base['median'] else float('inf')
+        if ratio > 1 + threshold:
+            status = 'regression'
+        elif ratio < 1 - threshold:
+            status = 'improvement'
+        else:
+            status = 'ok'
+        rows.append((name, base['median'], current['median'], ratio, status))
+    return rows
+
+
+def format_comparison(rows):
+    lines = [f"{'замер':<48}{'база, мс':>12}{'сейчас, мс':>12}{'x':>8}  статус"]
+    for name, base, current, ratio, status in rows:
+        base_text = f"{base:.3f}" if base is not None else "-"
+        ratio_text = f"{ratio:.2f}" if ratio is not None else "-"
+        lines.append(f"{name:<48}{base_text:>12}{current:>12.3f}{ratio_text:>8}  {status}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Замеры производительности игры «Кирпичи»")
+    parser.add_argument('--cases', nargs='+', default=list(CASES), choices=list(CASES))
+    parser.add_argument('--sizes', nargs='+', type=int, default=DEFAULT_SIZES, help="число пользователей в синтетических файлах")
+    parser.add_argument('--max-users', type=int, default=None, help="добавить размеры 10^k вплоть до этого числа")
+    parser.add_argument('--modes', nargs='+', default=['json', 'sqlite'], choices=['json', 'journal', 'binary', 'sharded', 'sqlite'])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', default=None, help="сохранить результаты в json-файл")
+    parser.add_argument('--baseline', default=None, help="сравнить с ранее сохраненными результатами")
+    parser.add_argument('--threshold', type=float, default=0.1, help="допустимый рост медианы (доля)")
+    parser.add_argument('--child-startup', default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child_startup:
+        child_startup(args.child_startup)
+        return 0
+
+    sizes = sorted(set(args.sizes))
+    if args.max_users:
+        size = 100
+        while size <= args.max_users:
+            sizes.append(size)
+            size *= 10
+        sizes = sorted(set(sizes))
+
+    workdir = tempfile.mkdtemp(prefix="bricks_bench_")
+    try:
+        ctx = BenchContext(workdir, sizes, args.modes, args.repeat)
+        results, skipped = run_suite(ctx, args.cases)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        'meta': {
+            'created_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'sizes': sizes,
+            'modes': args.modes,
+            'repeat': args.repeat
+        },
+        'skipped': skipped,
+        'results': results
+    }
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
+
+    for name, reason in skipped.items():
+        print(f"пропущен {name}: {reason}", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+        rows = compare(results, baseline, args.threshold)
+        print(format_comparison(rows), file=sys.stderr)
+        # ненулевой код возврата, чтобы регрессию было видно в скриптах
+        if any(row[4] == 'regression' for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
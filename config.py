@@ -117,9 +117,104 @@ BRICKS_GAME = {
     'max_bricks': 20,
     'min_take': 1,
     'max_take': 3,
+    # явный набор разрешенных ходов вместо диапазона min_take..max_take
+    'allowed_moves': None,
+    # в мизерном варианте проигрывает взявший последний кирпич
+    'misere': False,
+    # стратегия ai: 'random' - случайные ходы, 'heuristic' - перебор на 2 хода,
+    # 'optimal' - идеальная игра
+    'ai_strategy': 'optimal',
     'save_file': 'bricks_stats.json',
 }
 
+STORAGE = {
+    # 'json' - полная перезапись users.json, 'journal' - снапшот + журнал,
+    # 'sharded' - пользователи разбиты по хешу логина на файлы, читаются по одному,
+    # 'sqlite' - база sqlite с индексами для таблицы лидеров
+    'mode': 'journal',
+    'journal_suffix': '.journal',
+    'compact_threshold': 500,
+    'sqlite_file': 'users.db',
+    # формат снапшота для json/journal: 'json' - users.json, 'binary' - компактный users.bin
+    'snapshot_format': 'json',
+    'binary_file': 'users.bin',
+    # режим 'sharded': каталог, число шардов и сколько из них держать в памяти
+    'shard_dir': 'users_shards',
+    'shards': 16,
+    'max_loaded_shards': 4,
+    # json/journal: изменения пишет фоновый поток, объединяя их за write_delay секунд
+    'write_behind': True,
+    'write_delay': 0.5,
+}
+
+SECURITY = {
+    # стоимость хеширования пароля (pbkdf2-sha256): больше итераций - медленнее подбор и вход;
+    # при изменении записи перехешируются при следующем входе
+    'password_iterations': 240000,
+    'salt_bytes': 16,
+    # сколько фоновых потоков проверяют пароли
+    'hash_workers': 2,
+}
+
+SCREENS = {
+    # экраны кэшируются: бюджет на все экраны в числе виджетов tk (None - без ограничения);
+    # при превышении уничтожаются редко открываемые скрытые экраны, 0 - не кэшировать вовсе
+    'max_widgets': None,
+}
+
+STARTUP = {
+    # что подгружается в фоне, пока показан стартовый экран
+    'prewarm': ['utils', 'auth', 'game_screen'],
+    # пауза перед прогревом, мс: сначала отрисовываем первый кадр
+    'prewarm_delay': 200,
+    # печатать при выходе время импорта отложенных модулей
+    'import_report': False,
+}
+
+ICON_CACHE = {
+    # растеризованные svg сохраняются в png и при следующих запусках читаются без cairosvg
+    'enabled': True,
+    'dir_name': 'icons',
+    # во сколько раз крупнее логического размера растеризуется иконка
+    'scale': 1,
+    # бюджет памяти для растров и CTkImage, байт
+    'memory_budget': 8 * 1024 * 1024,
+    # иконки (имя, размер), которые растеризуются в фоне, пока показан стартовый экран
+    'prewarm': [
+        ('bricks', (80, 80)),
+        ('bricks', (24, 24)),
+        ('brick', (36, 36)),
+        ('trophy', (28, 28)),
+        ('trophy', (20, 20)),
+        ('play', (16, 16)),
+        ('scroll', (20, 20)),
+    ],
+    'prewarm_workers': 4,
+}
+
+HISTORY = {
+    # история ходов: сколько записей (ходов и событий партий) хранится за сессию
+    # и сколько строк держит текстовое поле на экране
+    'capacity': 1000,
+    'max_lines': 200,
+}
+
+TOASTS = {
+    # уведомления: сколько видно одновременно, сколько мс держится каждое
+    # и сколько может ждать в очереди (лишние, самые старые, отбрасываются)
+    'max_visible': 3,
+    'duration': 2000,
+    'max_queue': 5,
+}
+
+LEADERBOARD = {
+    # высота строки таблицы лидеров и запас строк за краями видимой области
+    'row_height': 44,
+    'overscan': 2,
+    # пауза после последнего нажатия клавиши перед поиском игроков, мс
+    'search_debounce': 250,
+}
+
 
 def get_base_dir() -> Path:
     """
@@ -133,6 +228,18 @@ def get_base_dir() -> Path:
     return Path(__file__).resolve().parent
 
 
+def get_cache_dir() -> Path:
+    """
+    Возвращает каталог дискового кэша (растеризованные иконки и т.п.).
+    В режиме .py - рядом с проектом и users.json, в .exe - в пользовательском
+    каталоге кэша, так как распакованная сборка при каждом запуске новая.
+    """
+    if getattr(sys, 'frozen', False):
+        root = os.environ.get('LOCALAPPDATA') or os.environ.get('XDG_CACHE_HOME') or str(Path.home() / '.cache')
+        return Path(root) / 'LAB18-20'
+    return get_base_dir() / '.cache'
+
+
 BASE_DIR: Path = get_base_dir()
 ICONS_DIR: Path = BASE_DIR / 'icons'
 
@@ -0,0 +1,282 @@
+# модуль содержит правила игры "кирпичи" без зависимостей от интерфейса
+import random
+from collections import deque
+from config import BRICKS_GAME
+
+
+PLAYER = 'player'
+AI = 'ai'
+
+OPPONENT = {PLAYER: AI, AI: PLAYER}
+
+
+class Rules:
+    # набор правил; хешируется, чтобы кэшировать по нему таблицы ai (после создания не меняется)
+    __slots__ = ('moves', 'misere', 'min_bricks', 'max_bricks')
+
+    def __init__(self, moves, misere=False, min_bricks=None, max_bricks=None):
+        moves = tuple(sorted(set(moves)))
+        if not moves or moves[0] < 1:
+            raise ValueError("Ходы должны быть положительными числами")
+
+        self.moves = moves
+        self.misere = bool(misere)
+        # 0 - допустимый размер кучи, поэтому по умолчанию только None
+        self.min_bricks = BRICKS_GAME['min_bricks'] if min_bricks is None else min_bricks
+        self.max_bricks = BRICKS_GAME['max_bricks'] if max_bricks is None else max_bricks
+
+    @classmethod
+    def from_config(cls, config=None):
+        # правила из словаря в формате BRICKS_GAME
+        config = config or BRICKS_GAME
+        moves = config.get('allowed_moves') or range(config['min_take'], config['max_take'] + 1)
+        return cls(moves, config.get('misere', False), config['min_bricks'], config['max_bricks'])
+
+    def key(self):
+        # размер стартовой кучи на исход не влияет, поэтому в ключ не входит
+        return (self.moves, self.misere)
+
+    def __eq__(self, other):
+        return isinstance(other, Rules) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __repr__(self):
+        return f"Rules(moves={self.moves}, misere={self.misere})"
+
+
+class GameState:
+    # компактное состояние партии; один объект переиспользуется между играми
+    __slots__ = ('bricks_left', 'start_bricks', 'turn', 'active', 'loser', 'moves_made')
+
+    def __init__(self):
+        self.bricks_left = 0
+        self.start_bricks = 0
+        self.turn = PLAYER
+        self.active = False
+        self.loser = None
+        self.moves_made = 0
+
+    @property
+    def winner(self):
+        return OPPONENT[self.loser] if self.loser else None
+
+
+class GameListener:
+    # интерфейс событий движка; экраны переопределяют нужные методы
+    def on_new_game(self, state):
+        pass
+
+    def on_move(self, state, who, amount):
+        pass
+
+    def on_invalid_move(self, state, amount):
+        pass
+
+    def on_turn(self, state):
+        pass
+
+    def on_game_over(self, state, loser):
+        pass
+
+
+class BricksEngine:
+    # движок применяет ходы к состоянию и сообщает о событиях слушателю
+    def __init__(self, rules=None, listener=None, rng=None, strategy=None):
+        # правила можно передать объектом Rules или словарем как BRICKS_GAME
+        if not isinstance(rules, Rules):
+            rules = Rules.from_config(rules)
+        self.rules = rules
+        self.min_bricks = rules.min_bricks
+        self.max_bricks = rules.max_bricks
+        self.moves = rules.moves
+
+        self.listener = listener or GameListener()
+        self.rng = rng or random.Random()
+        self.state = GameState()
+
+        # стратегия ai подключается лениво, чтобы не тянуть ее в простые симуляции
+        if strategy is None:
+            from ai import make_strategy
+            strategy = make_strategy(BRICKS_GAME['ai_strategy'], rules)
+        self.strategy = strategy
+
+    def new_game(self, bricks=None):
+        # сбрасываем состояние без создания новых объектов
+        s = self.state
+        if bricks is None:
+            bricks = self.rng.randint(self.min_bricks, self.max_bricks)
+        s.bricks_left = s.start_bricks = bricks
+        s.turn = PLAYER
+        s.active = True
+        s.loser = None
+        s.moves_made = 0
+        self.listener.on_new_game(s)
+
+        # в куче меньше минимального хода игроку нечем ходить: партия окончена сразу,
+        # как если бы последним ходил ai
+        if s.bricks_left < self.moves[0]:
+            self.end_game(AI if self.rules.misere else PLAYER)
+
+    def reset(self):
+        # возвращаем состояние до первой партии (без событий слушателю)
+        s = self.state
+        s.bricks_left = s.start_bricks = 0
+        s.turn = PLAYER
+        s.active = False
+        s.loser = None
+        s.moves_made = 0
+
+    def can_take(self, amount):
+        # допустимо ли взять amount кирпичей в текущей позиции
+        return amount in self.moves and amount <= self.state.bricks_left
+
+    def legal_moves(self):
+        bricks_left = self.state.bricks_left
+        return [amount for amount in self.moves if amount <= bricks_left]
+
+    def player_move(self, amount):
+        # ход игрока; возвращает True, если ход принят
+        s = self.state
+        if not s.active or s.turn != PLAYER:
+            return False
+
+        if not self.can_take(amount):
+            self.listener.on_invalid_move(s, amount)
+            return False
+
+        self.take(PLAYER, amount)
+        return True
+
+    def ai_move(self):
+        # ход компьютера; возвращает число взятых кирпичей или 0
+        s = self.state
+        if not s.active or s.turn != AI:
+            return 0
+
+        amount = self.calculate_ai_move()
+        self.take(AI, amount)
+        return amount
+
+    def calculate_ai_move(self):
+        # ход выбирает подключенная стратегия
+        return self.strategy.choose(self.state.bricks_left, self.rng)
+
+    def take(self, who, amount):
+        # применяем ход и передаем очередь; кто не может ходить - проиграл
+        # (в мизерном варианте наоборот - проиграл сделавший последний ход)
+        s = self.state
+        s.bricks_left -= amount
+        s.moves_made += 1
+        self.listener.on_move(s, who, amount)
+
+        opponent = OPPONENT[who]
+        if s.bricks_left < self.moves[0]:
+            self.end_game(who if self.rules.misere else opponent)
+            return
+
+        s.turn = opponent
+        self.listener.on_turn(s)
+
+    def end_game(self, loser):
+        s = self.state
+        s.active = False
+        s.loser = loser
+        self.listener.on_game_over(s, loser)
+
+
+class MoveHistory:
+    """
+    История партий сессии в кольцевом буфере фиксированной емкости:
+    новые записи вытесняют самые старые, поэтому память не растет.
+    Запись - словарь: начало партии ('new_game'), ход ('move') или итог ('game_over'),
+    с номером партии. Историю можно выгрузить (export) и проиграть заново (replay).
+    """
+    def __init__(self, capacity=1000):
+        self.entries = deque(maxlen=capacity)
+        self.game = 0
+
+    def start_game(self, bricks):
+        self.game += 1
+        self.entries.append({'event': 'new_game', 'game': self.game, 'bricks': bricks})
+
+    def record_move(self, who, amount, bricks_left):
+        self.entries.append({
+            'event': 'move',
+            'game': self.game,
+            'who': who,
+            'amount': amount,
+            'bricks_left': bricks_left
+        })
+
+    def record_result(self, loser):
+        self.entries.append({'event': 'game_over', 'game': self.game, 'loser': loser})
+
+    def clear(self):
+        self.entries.clear()
+        self.game = 0
+
+    def export(self):
+        # копия записей, пригодная для json
+        return [dict(entry) for entry in self.entries]
+
+    def game_moves(self, game=None):
+        # стартовая куча и ходы [(кто, сколько)] партии game (по умолчанию последней);
+        # None, если начало партии уже вытеснено из буфера
+        game = self.game if game is None else game
+        start = None
+        moves = []
+        for entry in self.entries:
+            if entry['game'] != game:
+                continue
+            if entry['event'] == 'new_game':
+                start = entry['bricks']
+            elif entry['event'] == 'move':
+                moves.append((entry['who'], entry['amount']))
+        if start is None:
+            return None
+        return start, moves
+
+    def replay(self, game=None, rules=None):
+        """
+        Проигрывает партию заново по правилам. Возвращает позиции после каждого хода
+        [(кто, сколько, осталось)] и проигравшего (None, если партия не закончена).
+        """
+        rules = rules or Rules.from_config()
+        recorded = self.game_moves(game)
+        if recorded is None:
+            raise ValueError("Начало партии вытеснено из истории")
+
+        bricks, moves = recorded
+        positions = []
+        for who, amount in moves:
+            if amount not in rules.moves or amount > bricks:
+                raise ValueError(f"Недопустимый ход в истории: {who} взял {amount} из {bricks}")
+            bricks -= amount
+            positions.append((who, amount, bricks))
+            if bricks < rules.moves[0]:
+                return positions, (who if rules.misere else OPPONENT[who])
+        return positions, None
+
+
+def play_out(bricks, first_policy, second_policy, rules=None):
+    """
+    Быстро доигрывает партию без событий и аллокаций.
+    Политика - функция (bricks_left) -> amount. Возвращает 0, если
+    выиграл ходивший первым, и 1, если второй.
+    """
+    rules = rules or Rules.from_config()
+    min_move = rules.moves[0]
+    misere = 1 if rules.misere else 0
+    policies = (first_policy, second_policy)
+    if bricks < min_move:
+        # первому нечем ходить - как если бы последним ходил второй
+        return 1 ^ misere
+    side = 0
+    while True:
+        bricks -= policies[side](bricks)
+        if bricks < min_move:
+            # в обычной игре побеждает сделавший последний ход
+            return side ^ misere
+        side ^= 1
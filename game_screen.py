@@ -1,12 +1,14 @@
 # модуль содержит основной игровой экран с меню и функционалом
 import customtkinter as ctk
-import random
-from config import COLORS, FONTS, SIZES, BRICKS_GAME
+from config import COLORS, FONTS, SIZES, BRICKS_GAME, HISTORY
+from engine import AI, PLAYER, BricksEngine, GameListener, MoveHistory
 from utils import IconLoader
+from widgets import BrickWallRenderer, HistoryView, ToastManager, configure_changed
+from timers import TimerRegistry
 from stats_screen import StatsScreen
 
 
-class GameScreen(ctk.CTkFrame):
+class GameScreen(ctk.CTkFrame, GameListener):
     # основной экран с игрой, меню и пользовательской информацией
     def __init__(self, parent, auth_manager, on_logout, on_exit):
         super().__init__(parent, fg_color=COLORS['bg_primary'])
@@ -14,11 +16,18 @@ class GameScreen(ctk.CTkFrame):
         self.on_logout = on_logout
         self.on_exit = on_exit
         
-        # игровые переменные
-        self.bricks_left = 0
-        self.current_turn = "player"
-        self.game_active = False
-        self.move_history = []
+        # правила и состояние партии живут в движке, экран только отображает события
+        self.engine = BricksEngine(BRICKS_GAME, listener=self)
+        # ходы партий сессии хранятся в кольцевом буфере ограниченной емкости
+        self.move_history = MoveHistory(HISTORY['capacity'])
+        
+        # все отложенные вызовы экрана (ход AI, перерисовка, уведомления) учитываются здесь
+        self.timers = TimerRegistry(self)
+        
+        # события движка только помечают части экрана устаревшими;
+        # перерисовка одна на серию событий, в свободное время цикла tk
+        self.dirty = set()
+        self.turn_icons = None
         
         # параметры отображения кирпичей
         self.brick_size = (36, 36)
@@ -27,6 +36,21 @@ class GameScreen(ctk.CTkFrame):
         self.max_brick_rows = 6
         
         self.create_widgets()
+        
+        # уведомления показываются на пуле подписей поверх экрана
+        self.toasts = ToastManager(self, self.timers, rely=0.1)
+    
+    @property
+    def bricks_left(self):
+        return self.engine.state.bricks_left
+    
+    @property
+    def current_turn(self):
+        return self.engine.state.turn
+    
+    @property
+    def game_active(self):
+        return self.engine.state.active
     
     def create_widgets(self):
         # главный контейнер
@@ -72,7 +96,7 @@ class GameScreen(ctk.CTkFrame):
         username = self.auth_manager.get_current_username()
         user_icon, _ = IconLoader.get_text_with_icon('user', '', size=(24, 24))
         
-        greeting = ctk.CTkLabel(
+        self.greeting = ctk.CTkLabel(
             left_section,
             text=f"Добро пожаловать, {username}!",
             image=user_icon if user_icon else None,
@@ -80,7 +104,7 @@ class GameScreen(ctk.CTkFrame):
             text_color=COLORS['text_primary'],
             compound="left"
         )
-        greeting.pack(anchor="w")
+        self.greeting.pack(anchor="w")
         
         subtitle = ctk.CTkLabel(
             left_section,
@@ -194,6 +218,13 @@ class GameScreen(ctk.CTkFrame):
             text_color=COLORS['text_muted']
         )
         self.bricks_label.pack(pady=(0, SIZES['padding_sm']))
+        
+        self.brick_wall = BrickWallRenderer(
+            self.bricks_wall_container,
+            self.brick_icon,
+            per_row=self.bricks_per_row,
+            max_rows=self.max_brick_rows
+        )
         self.render_brick_wall()
         
         # индикатор хода
@@ -241,10 +272,10 @@ class GameScreen(ctk.CTkFrame):
         btn_container.pack()
         
         self.move_buttons = []
-        for i in range(1, 4):
+        for i in self.engine.moves:
             btn = ctk.CTkButton(
                 btn_container,
-                text=f"{i} кирпич" + ("а" if i == 2 else "ей" if i == 3 else ""),
+                text=f"{i} {self.get_brick_suffix(i)}",
                 font=FONTS['body_lg'],
                 width=150,
                 height=SIZES['button_height_lg'],
@@ -292,75 +323,94 @@ class GameScreen(ctk.CTkFrame):
             state="disabled"
         )
         self.history_text.pack(fill="both", expand=True)
+        
+        # строки истории вставляются пачкой при перерисовке, старые обрезаются
+        self.history_view = HistoryView(self.history_text, HISTORY['max_lines'])
+    
+    def reset(self):
+        # экран из кэша показывается новому входу: приветствие и партия с чистого листа
+        username = self.auth_manager.get_current_username()
+        self.greeting.configure(text=f"Добро пожаловать, {username}!")
+        
+        # уведомления и таймеры прошлой сессии (ход AI) не должны сработать в новой
+        self.toasts.clear()
+        self.timers.cancel_all()
+        self.engine.reset()
+        self.move_history.clear()
+        self.clear_history()
+        self.invalidate('bricks', 'turn', 'buttons')
+    
+    def on_hide(self):
+        # экран спрятан (выход из аккаунта): отложенный ход AI не должен менять партию за кадром,
+        # а партия все равно сбрасывается в reset() при следующем показе
+        self.toasts.clear()
+        self.timers.cancel_all()
+    
+    def invalidate(self, *parts):
+        # помечаем части экрана ('bricks', 'turn', 'buttons', 'history') и планируем одну перерисовку
+        self.dirty.update(parts)
+        self.timers.after_idle(self.refresh, key='refresh')
+    
+    def refresh(self):
+        # применяем все накопленные изменения разом
+        dirty, self.dirty = self.dirty, set()
+        
+        if 'bricks' in dirty:
+            self.update_bricks_display()
+        if 'turn' in dirty:
+            self.update_turn_display()
+        if 'buttons' in dirty:
+            self.update_move_buttons()
+        if 'history' in dirty:
+            self.history_view.flush()
+    
+    def destroy(self):
+        # ни один отложенный вызов не должен сработать после уничтожения экрана
+        self.timers.cancel_all()
+        super().destroy()
     
     def start_new_game(self):
         # запуск новой игры
-        self.bricks_left = random.randint(BRICKS_GAME['min_bricks'], BRICKS_GAME['max_bricks'])
-        self.current_turn = "player"
-        self.game_active = True
-        self.move_history = []
-        
-        self.update_bricks_display()
-        self.update_turn_display()
-        self.update_move_buttons()
-        self.clear_history()
-        
-        self.add_to_history(f"Новая игра! Кирпичей: {self.bricks_left}")
+        self.engine.new_game()
     
     def player_move(self, amount):
         # обработка хода игрока
-        if not self.game_active or self.current_turn != "player":
-            return
-        
-        if amount > self.bricks_left:
-            self.show_notification("Нельзя взять больше кирпичей!", "error")
-            return
-        
-        self.bricks_left -= amount
-        self.add_to_history(f"Игрок взял {amount} {self.get_brick_suffix(amount)}")
-        self.update_bricks_display()
-        
-        if self.bricks_left == 0:
-            self.end_game("ai")
-            return
-        
-        self.current_turn = "ai"
-        self.update_turn_display()
-        self.update_move_buttons()
-        self.after(1000, self.ai_move)
+        self.engine.player_move(amount)
     
     def ai_move(self):
         # ход компьютера
-        if not self.game_active or self.current_turn != "ai":
-            return
-        
-        amount = self.calculate_ai_move()
-        self.bricks_left -= amount
-        self.add_to_history(f"AI взял {amount} {self.get_brick_suffix(amount)}")
-        self.update_bricks_display()
-        
-        if self.bricks_left == 0:
-            self.end_game("player")
-            return
-        
-        self.current_turn = "player"
-        self.update_turn_display()
-        self.update_move_buttons()
+        self.engine.ai_move()
     
-    def calculate_ai_move(self):
-        # расчет хода AI
-        if self.bricks_left <= BRICKS_GAME['max_take']:
-            return self.bricks_left
+    def on_new_game(self, state):
+        # движок начал новую партию; история прошлых партий остается в буфере
+        self.move_history.start_game(state.bricks_left)
+        self.clear_history()
         
-        max_take = min(BRICKS_GAME['max_take'], self.bricks_left)
-        return random.randint(BRICKS_GAME['min_take'], max_take)
+        self.add_to_history(f"Новая игра! Кирпичей: {state.bricks_left}")
+        self.invalidate('bricks', 'turn', 'buttons')
+    
+    def on_move(self, state, who, amount):
+        # движок применил ход игрока или AI
+        self.move_history.record_move(who, amount, state.bricks_left)
+        name = "Игрок" if who == PLAYER else "AI"
+        self.add_to_history(f"{name} взял {amount} {self.get_brick_suffix(amount)}")
+        self.invalidate('bricks')
     
-    def end_game(self, loser):
+    def on_invalid_move(self, state, amount):
+        self.show_notification("Нельзя взять больше кирпичей!", "error")
+    
+    def on_turn(self, state):
+        # очередь перешла к другой стороне
+        self.invalidate('turn', 'buttons')
+        if state.turn == AI:
+            self.timers.after(1000, self.ai_move, key='ai_move', replace=False)
+    
+    def on_game_over(self, state, loser):
         # завершение игры и сохранение статистики
-        self.game_active = False
-        self.update_move_buttons()
+        self.move_history.record_result(loser)
+        self.invalidate('bricks', 'turn', 'buttons')
         
-        if loser == "player":
+        if loser == PLAYER:
             self.auth_manager.update_user_stats('loss')
             self.add_to_history("\n✗ Вы проиграли! Победил AI")
             self.show_notification("AI победил!", "error")
@@ -373,115 +423,69 @@ class GameScreen(ctk.CTkFrame):
         # обновление визуализации кирпичей
         self.render_brick_wall()
         if self.game_active:
-            self.bricks_label.configure(
+            configure_changed(
+                self.bricks_label,
                 text=f"Осталось: {self.bricks_left}",
                 text_color=COLORS['warning'] if self.bricks_left <= 5 else COLORS['text_primary']
             )
         else:
-            self.bricks_label.configure(
+            configure_changed(
+                self.bricks_label,
                 text="Нажмите 'Новая игра' для начала",
                 text_color=COLORS['text_muted']
             )
     
     def render_brick_wall(self):
         # отрисовка стены из кирпичей
-        for child in self.bricks_wall_container.winfo_children():
-            child.destroy()
-        
-        if not self.game_active or self.bricks_left == 0:
-            placeholder = ctk.CTkLabel(
-                self.bricks_wall_container,
-                text="Стена появится после начала игры",
-                font=FONTS['body_md'],
-                text_color=COLORS['text_muted']
-            )
-            placeholder.place(relx=0.5, rely=0.5, anchor="center")
-            return
-        
-        bricks_capacity = self.bricks_per_row * self.max_brick_rows
-        bricks_to_show = min(self.bricks_left, bricks_capacity)
-        
-        full_rows, remainder = divmod(bricks_to_show, self.bricks_per_row)
-        row_counts = []
-        if remainder:
-            row_counts.append(remainder)
-        for _ in range(min(full_rows, self.max_brick_rows - len(row_counts))):
-            row_counts.append(self.bricks_per_row)
-        
-        wall_content = ctk.CTkFrame(self.bricks_wall_container, fg_color="transparent")
-        wall_content.place(relx=0.5, rely=0.5, anchor="center")
-        
-        for bricks_in_row in row_counts:
-            row_frame = ctk.CTkFrame(wall_content, fg_color="transparent")
-            row_frame.pack(anchor="center", pady=2)
-            
-            for _ in range(bricks_in_row):
-                brick_widget = self.create_brick_widget(row_frame)
-                brick_widget.pack(side="left", padx=2, pady=1)
-        
-        if self.bricks_left > bricks_to_show:
-            more_label = ctk.CTkLabel(
-                wall_content,
-                text=f"+ ещё {self.bricks_left - bricks_to_show}",
-                font=FONTS['body_sm'],
-                text_color=COLORS['text_secondary']
-            )
-            more_label.pack(pady=(SIZES['padding_xs'], 0))
-    
-    def create_brick_widget(self, parent):
-        # создание виджета одного кирпича
-        if isinstance(self.brick_icon, str):
-            return ctk.CTkLabel(
-                parent,
-                text=self.brick_icon,
-                font=FONTS['heading_md'],
-                text_color=COLORS['warning']
-            )
-        return ctk.CTkLabel(parent, text="", image=self.brick_icon)
+        self.brick_wall.render(self.bricks_left, self.game_active)
+    
+    def get_turn_icons(self):
+        # иконки индикатора хода загружаются один раз на экран
+        if self.turn_icons is None:
+            user_icon, _ = IconLoader.get_text_with_icon('user', 'Ваш ход', size=(20, 20))
+            robot_icon, _ = IconLoader.get_text_with_icon('robot', 'Ход AI...', size=(20, 20))
+            self.turn_icons = {'player': user_icon, 'ai': robot_icon}
+        return self.turn_icons
     
     def update_turn_display(self):
         # обновление индикатора хода
         if self.game_active:
+            icons = self.get_turn_icons()
             if self.current_turn == "player":
-                user_icon, _ = IconLoader.get_text_with_icon('user', 'Ваш ход', size=(20, 20))
-                self.turn_label.configure(
+                user_icon = icons['player']
+                configure_changed(
+                    self.turn_label,
                     text="Ваш ход" if not user_icon else "",
                     image=user_icon,
                     text_color=COLORS['success'],
                     compound="left"
                 )
             else:
-                robot_icon, _ = IconLoader.get_text_with_icon('robot', 'Ход AI...', size=(20, 20))
-                self.turn_label.configure(
+                robot_icon = icons['ai']
+                configure_changed(
+                    self.turn_label,
                     text="Ход AI..." if not robot_icon else "",
                     image=robot_icon,
                     text_color=COLORS['info'],
                     compound="left"
                 )
         else:
-            self.turn_label.configure(text="", image=None)
+            configure_changed(self.turn_label, text="", image=None)
     
     def update_move_buttons(self):
         # обновление состояния кнопок хода
-        if self.game_active and self.current_turn == "player":
-            for i, btn in enumerate(self.move_buttons, 1):
-                if i <= self.bricks_left:
-                    btn.configure(
-                        state="normal",
-                        fg_color=COLORS['primary'],
-                        hover_color=COLORS['primary_hover'],
-                        text_color=COLORS['text_primary']
-                    )
-                else:
-                    btn.configure(
-                        state="disabled",
-                        fg_color=COLORS['border'],
-                        hover_color=COLORS['border'],
-                        text_color=COLORS['text_muted']
-                    )
-        else:
-            for btn in self.move_buttons:
-                btn.configure(
+        for i, btn in zip(self.engine.moves, self.move_buttons):
+            if self.game_active and self.current_turn == "player" and self.engine.can_take(i):
+                configure_changed(
+                    btn,
+                    state="normal",
+                    fg_color=COLORS['primary'],
+                    hover_color=COLORS['primary_hover'],
+                    text_color=COLORS['text_primary']
+                )
+            else:
+                configure_changed(
+                    btn,
                     state="disabled",
                     fg_color=COLORS['border'],
                     hover_color=COLORS['border'],
@@ -489,17 +493,17 @@ class GameScreen(ctk.CTkFrame):
                 )
     
     def add_to_history(self, text):
-        # добавление записи в историю
-        self.history_text.configure(state="normal")
-        self.history_text.insert("end", text + "\n")
-        self.history_text.see("end")
-        self.history_text.configure(state="disabled")
+        # добавление записи в историю; в текстовое поле строки попадут при перерисовке
+        self.history_view.append(text)
+        self.invalidate('history')
     
     def clear_history(self):
-        # очистка истории
-        self.history_text.configure(state="normal")
-        self.history_text.delete("1.0", "end")
-        self.history_text.configure(state="disabled")
+        # очистка текстового поля истории (записи в move_history остаются)
+        self.history_view.clear()
+    
+    def export_history(self):
+        # структурированная история ходов сессии - для сохранения и повтора партий
+        return self.move_history.export()
     
     def show_stats(self):
         # открытие окна статистики
@@ -525,25 +529,8 @@ class GameScreen(ctk.CTkFrame):
         )
     
     def show_notification(self, text, msg_type="info"):
-        # показ уведомления
-        color_map = {
-            "success": COLORS['success'],
-            "error": COLORS['error'],
-            "info": COLORS['info']
-        }
-        
-        notification = ctk.CTkLabel(
-            self,
-            text=text,
-            font=FONTS['body_md'],
-            fg_color=color_map.get(msg_type, COLORS['info']),
-            text_color="white",
-            corner_radius=SIZES['border_radius_sm'],
-            width=300,
-            height=50
-        )
-        notification.place(relx=0.5, rely=0.1, anchor="center")
-        self.after(2000, notification.destroy)
+        # показ уведомления (повторы одного сообщения объединяются)
+        self.toasts.show(text, msg_type)
     
     def get_brick_suffix(self, amount):
         # склонение слова "кирпич"
@@ -0,0 +1,180 @@
+# модуль реализует журнал изменений пользователей поверх снапшота users.json
+import os
+import json
+import threading
+
+
+# служебный ключ снапшота; логины только из букв и цифр, поэтому коллизий нет
+META_KEY = '_meta'
+
+
+def apply_record(users, record):
+    # применяем одну запись журнала к словарю пользователей
+    op = record.get('op')
+    login = record.get('login')
+
+    if op == 'register':
+        # запись может ждать в очереди на диск: в памяти держим свою копию,
+        # иначе последующие результаты попадут в уже поставленную запись регистрации
+        data = record['data']
+        users[login] = dict(data, stats=dict(data['stats']))
+    elif op == 'result' and login in users:
+        # статистику заменяем новым словарем: фоновая запись видит либо старую, либо новую
+        stats = dict(users[login]['stats'])
+        stats['games'] += 1
+
+        if record['result'] == 'win':
+            stats['wins'] += 1
+        elif record['result'] == 'loss':
+            stats['losses'] += 1
+        users[login]['stats'] = stats
+    elif op == 'password' and login in users:
+        # новый хеш пароля (перехеширование при входе); запись тоже заменяется целиком
+        users[login] = dict(users[login], password=record['password'])
+
+
+class StatsJournal:
+    # журнал дописывает по одной короткой строке на каждое изменение данных
+    def __init__(self, users_file, suffix='.journal', compact_threshold=500, write_file=None):
+        self.users_file = users_file
+        self.path = users_file + suffix
+        self.compact_threshold = compact_threshold
+        # функция атомарной записи снапшота (json или бинарный формат)
+        self.write_file = write_file or write_json_atomic
+
+        # номер последней записи и номер, уже вошедший в снапшот
+        self.seq = 0
+        self.snapshot_seq = 0
+        self.pending = 0
+
+        self._lock = threading.Lock()
+        self._snapshot_lock = threading.Lock()
+        self._compacting = False
+        self._file = None
+
+    def replay(self, users):
+        # применяем к снапшоту все записи журнала, которых в нем еще нет
+        meta = users.pop(META_KEY, {})
+        self.snapshot_seq = self.seq = meta.get('journal_seq', 0)
+
+        if not os.path.exists(self.path):
+            return users
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # недописанная при аварии строка игнорируется
+                    continue
+
+                if record['seq'] <= self.snapshot_seq:
+                    continue
+
+                apply_record(users, record)
+                self.seq = record['seq']
+                self.pending += 1
+
+        return users
+
+    def append(self, record):
+        # дописываем запись в конец журнала, не трогая снапшот
+        self.append_many([record])
+
+    def append_many(self, records):
+        # пачка записей уходит в файл одной операцией записи
+        if not records:
+            return
+        with self._lock:
+            lines = []
+            for record in records:
+                self.seq += 1
+                record['seq'] = self.seq
+                lines.append(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n')
+
+            if self._file is None:
+                self._file = open(self.path, 'a', encoding='utf-8')
+
+            self._file.write(''.join(lines))
+            self._file.flush()
+            self.pending += len(records)
+
+    def needs_compaction(self):
+        # пора ли свернуть журнал в снапшот
+        return self.pending >= self.compact_threshold and not self._compacting
+
+    def compact_async(self, users):
+        # сворачиваем журнал в снапшот в фоновом потоке
+        if self._compacting:
+            return None
+
+        # копируем состояние в потоке интерфейса, сериализуем и пишем в фоне
+        snapshot = {login: dict(data, stats=dict(data['stats'])) for login, data in users.items()}
+        seq = self.seq
+        self._compacting = True
+        self.pending = 0
+
+        thread = threading.Thread(target=self._compact, args=(snapshot, seq), daemon=True)
+        thread.start()
+        return thread
+
+    def _compact(self, snapshot, seq):
+        try:
+            self.write_snapshot(snapshot, seq)
+        except Exception as e:
+            print(f"Ошибка сжатия журнала: {e}")
+        finally:
+            self._compacting = False
+
+    def write_snapshot(self, users, seq=None):
+        # пишем снапшот с отметкой журнала и отбрасываем вошедшие в него записи
+        seq = self.seq if seq is None else seq
+        snapshot = dict(users)
+        snapshot[META_KEY] = {'journal_seq': seq}
+
+        with self._snapshot_lock:
+            # более свежий снапшот уже записан синхронным сохранением
+            if seq < self.snapshot_seq:
+                return
+            self.write_file(self.users_file, snapshot)
+            self.snapshot_seq = seq
+            self._truncate(seq)
+
+    def _truncate(self, seq):
+        # оставляем в журнале только записи, появившиеся во время сжатия
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+            tail = []
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            if json.loads(line)['seq'] > seq:
+                                tail.append(line)
+                        except ValueError:
+                            continue
+
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.writelines(tail)
+            os.replace(tmp_path, self.path)
+
+    def close(self):
+        # закрываем файл журнала
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def write_json_atomic(path, data):
+    # пишем json во временный файл и атомарно подменяем исходный
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
@@ -0,0 +1,86 @@
+# модуль откладывает импорт тяжелых модулей до первого использования и замеряет его время
+import sys
+import time
+import importlib
+
+
+# время первого импорта каждого модуля, загруженного через load_module
+IMPORT_TIMES = {}
+
+
+def load_module(name):
+    """
+    Импортирует модуль по имени и запоминает, сколько занял первый импорт
+    (вместе со всеми модулями, которые он подтянул за собой).
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+
+    loaded_before = len(sys.modules)
+    started = time.perf_counter()
+    module = importlib.import_module(name)
+    IMPORT_TIMES[name] = {
+        'seconds': time.perf_counter() - started,
+        'new_modules': len(sys.modules) - loaded_before
+    }
+    return module
+
+
+class LazyAttr:
+    # заместитель объекта из модуля: модуль импортируется при первом обращении к атрибуту
+    def __init__(self, module_name, attr):
+        self._module_name = module_name
+        self._attr = attr
+        self._target = None
+
+    def resolve(self):
+        if self._target is None:
+            self._target = getattr(load_module(self._module_name), self._attr)
+        return self._target
+
+    def __getattr__(self, name):
+        return getattr(self.resolve(), name)
+
+    def __call__(self, *args, **kwargs):
+        return self.resolve()(*args, **kwargs)
+
+    def __repr__(self):
+        return f"LazyAttr({self._module_name}.{self._attr})"
+
+
+def prewarm(widget, steps, delay=0, on_done=None):
+    """
+    Выполняет шаги прогрева по одному в свободное время цикла tk,
+    чтобы окно оставалось отзывчивым. Шаг - имя модуля или функция.
+    delay - пауза перед первым шагом, чтобы сначала успел отрисоваться первый кадр.
+    """
+    steps = list(steps)
+
+    def run_next():
+        if not steps:
+            if on_done:
+                on_done()
+            return
+
+        step = steps.pop(0)
+        try:
+            if isinstance(step, str):
+                load_module(step)
+            else:
+                step()
+        except Exception as e:
+            print(f"Ошибка прогрева {step}: {e}")
+
+        # after(1, ...) вместо after_idle, чтобы между шагами успевали события ввода
+        widget.after(1, run_next)
+
+    widget.after(delay, run_next)
+
+
+def import_report():
+    # текстовый отчет о времени импорта, самые долгие модули сверху
+    lines = [f"{'модуль':<20}{'мс':>10}{'модулей':>10}"]
+    for name, data in sorted(IMPORT_TIMES.items(), key=lambda item: -item[1]['seconds']):
+        lines.append(f"{name:<20}{data['seconds'] * 1000:>10.1f}{data['new_modules']:>10}")
+    return "\n".join(lines)
@@ -0,0 +1,136 @@
+# модуль хранит таблицу лидеров отсортированной и обновляет ее по одной записи
+from bisect import bisect_left, insort
+from user_index import login_key
+
+
+# верхняя граница диапазона строк с префиксом: больше любого продолжения префикса
+PREFIX_END = '\U0010ffff'
+
+# если под префикс попадает не больше стольких игроков, они сортируются по рейтингу целиком,
+# иначе совпадения набираются обходом рейтинга сверху
+SEARCH_SORT_LIMIT = 20000
+
+
+def make_row(login, games, wins, losses):
+    # строка таблицы лидеров в формате, который ожидают экраны
+    return {
+        'login': login,
+        'games': games,
+        'wins': wins,
+        'losses': losses,
+        'winrate': (wins / games * 100) if games > 0 else 0
+    }
+
+
+def rank_key(login, stats):
+    # больше побед - выше; при равенстве порядок по логину
+    return (-stats['wins'], login)
+
+
+class LeaderboardIndex:
+    # отсортированный список ключей и статистика игроков для выдачи страниц
+    def __init__(self):
+        self._keys = []
+        self._stats = {}
+        # логины в порядке ключа без учета регистра - для поиска по префиксу (строятся при первом поиске)
+        self._names = None
+        # номер изменения индекса и результат последнего поиска
+        self.version = 0
+        self._search = None
+
+    def build(self, users):
+        # строим индекс один раз при загрузке пользователей
+        self.build_from_stats((login, data['stats']) for login, data in users.items())
+
+    def build_from_stats(self, items):
+        # то же по парам (логин, статистика) - например, при обходе шардов по одному
+        self._stats = {
+            login: (stats['games'], stats['wins'], stats['losses'])
+            for login, stats in items
+        }
+        self._keys = sorted((-wins, login) for login, (_, wins, _) in self._stats.items())
+        self._names = None
+        self.version += 1
+
+    def update(self, login, stats):
+        # переставляем одного игрока: удаление и вставка бинарным поиском
+        old = self._stats.get(login)
+        if old is not None:
+            i = bisect_left(self._keys, (-old[1], login))
+            del self._keys[i]
+        elif self._names is not None:
+            insort(self._names, (login_key(login), login))
+
+        self._stats[login] = (stats['games'], stats['wins'], stats['losses'])
+        insort(self._keys, rank_key(login, stats))
+        self.version += 1
+
+    def rank(self, login):
+        # позиция игрока в таблице, начиная с 1, или None
+        stats = self._stats.get(login)
+        if stats is None:
+            return None
+        return bisect_left(self._keys, (-stats[1], login)) + 1
+
+    def page(self, offset=0, limit=None):
+        # срез таблицы: трогаем только запрошенные строки
+        end = len(self._keys) if limit is None else offset + limit
+        return [self.row(login) for _, login in self._keys[offset:end]]
+
+    def row(self, login):
+        return make_row(login, *self._stats[login])
+
+    def rows(self):
+        # все строки без сортировки - для сортировки по другим полям
+        return [make_row(login, *stats) for login, stats in self._stats.items()]
+
+    def prefix_range(self, prefix):
+        # границы логинов с префиксом в списке имен - два бинарных поиска
+        if self._names is None:
+            self._names = sorted((login_key(login), login) for login in self._stats)
+        key = login_key(prefix)
+        return bisect_left(self._names, (key,)), bisect_left(self._names, (key + PREFIX_END,))
+
+    def search_count(self, prefix):
+        lo, hi = self.prefix_range(prefix)
+        return hi - lo
+
+    def search(self, prefix, offset=0, limit=None):
+        """
+        Страница игроков, чей логин начинается с prefix (без учета регистра),
+        в порядке таблицы лидеров. Строки содержат общее место игрока (rank).
+        Найденный список запоминается, поэтому прокрутка результатов не повторяет поиск.
+        """
+        key = login_key(prefix)
+        state = self._search
+        if state is None or state['key'] != key or state['version'] != self.version:
+            lo, hi = self.prefix_range(prefix)
+            if hi - lo <= SEARCH_SORT_LIMIT:
+                # совпадений немного: сортируем их по рейтингу один раз
+                logins = [login for _, login in self._names[lo:hi]]
+                logins.sort(key=lambda login: (-self._stats[login][1], login))
+                state = {'key': key, 'version': self.version, 'logins': logins, 'scanned': len(self._keys)}
+            else:
+                # совпадений много: они плотно идут в рейтинге, набираем их обходом сверху по мере прокрутки
+                state = {'key': key, 'version': self.version, 'logins': [], 'scanned': 0}
+            self._search = state
+
+        logins = state['logins']
+        end = self.search_count(prefix) if limit is None else offset + limit
+        scanned = state['scanned']
+        while len(logins) < end and scanned < len(self._keys):
+            login = self._keys[scanned][1]
+            if login_key(login).startswith(key):
+                logins.append(login)
+            scanned += 1
+        state['scanned'] = scanned
+
+        rows = []
+        for login in logins[offset:end]:
+            row = self.row(login)
+            row['rank'] = self.rank(login)
+            rows.append(row)
+        return rows
+
+    def __len__(self):
+        return len(self._keys)
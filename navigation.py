@@ -0,0 +1,106 @@
+# модуль переключает экраны приложения, создавая каждый экран один раз
+def count_widgets(widget):
+    # число виджетов tk в дереве экрана - грубая оценка занятой им памяти
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
+
+
+class ScreenManager:
+    """
+    Кэш экранов: экран создается фабрикой при первом показе, а дальше
+    только прячется (pack_forget) и показывается снова (pack).
+    Перед повторным показом вызывается метод экрана reset(), если он есть, -
+    там экран сбрасывает состояние прошлой сессии (поля ввода, партию).
+    Скрываемому экрану вызывается on_hide(), если он есть, - там экран
+    отменяет свои таймеры, чтобы они не срабатывали, пока его не видно.
+    max_widgets - бюджет на все экраны в числе виджетов (None - без ограничения);
+    при превышении уничтожаются скрытые экраны, которые открывали реже всего.
+    """
+    def __init__(self, container, max_widgets=None):
+        self.container = container
+        self.max_widgets = max_widgets
+        self.factories = {}
+        self.screens = {}
+        # сколько раз экран показывали и номер последнего показа
+        self.uses = {}
+        self.last_used = {}
+        self.clock = 0
+        self.current_name = None
+        self.created = 0
+        self.evicted = 0
+
+    def register(self, name, factory):
+        self.factories[name] = factory
+
+    @property
+    def current(self):
+        return self.screens.get(self.current_name)
+
+    def visible(self, name):
+        # экран name, если он сейчас на экране, иначе None
+        return self.screens.get(name) if name == self.current_name else None
+
+    def show(self, name):
+        # показываем экран name, скрывая текущий; возвращаем экземпляр экрана
+        if name == self.current_name:
+            return self.current
+
+        current = self.current
+        if current is not None:
+            current.pack_forget()
+            if hasattr(current, 'on_hide'):
+                current.on_hide()
+
+        screen = self.screens.get(name)
+        if screen is None:
+            screen = self.screens[name] = self.factories[name]()
+            self.created += 1
+        elif hasattr(screen, 'reset'):
+            screen.reset()
+
+        screen.pack(fill="both", expand=True)
+        self.current_name = name
+        self.clock += 1
+        self.uses[name] = self.uses.get(name, 0) + 1
+        self.last_used[name] = self.clock
+
+        self.enforce_budget()
+        return screen
+
+    def enforce_budget(self):
+        # вытесняем редко используемые скрытые экраны, пока не уложимся в бюджет
+        if self.max_widgets is None:
+            return
+
+        sizes = {name: count_widgets(screen) for name, screen in self.screens.items()}
+        total = sum(sizes.values())
+        candidates = sorted(
+            (name for name in self.screens if name != self.current_name),
+            key=lambda name: (self.uses[name], self.last_used[name])
+        )
+        for name in candidates:
+            if total <= self.max_widgets:
+                break
+            total -= sizes[name]
+            self.evict(name)
+
+    def evict(self, name):
+        # уничтожаем экран; при следующем показе он будет создан заново
+        screen = self.screens.pop(name, None)
+        if screen is None:
+            return
+        if name == self.current_name:
+            self.current_name = None
+        screen.destroy()
+        self.evicted += 1
+
+    def clear(self):
+        for name in list(self.screens):
+            self.evict(name)
+
+    def stats(self):
+        # счетчики для диагностики
+        return {
+            'cached': len(self.screens),
+            'created': self.created,
+            'evicted': self.evicted
+        }
@@ -0,0 +1,59 @@
+# модуль хеширует пароли пользователей (pbkdf2 с солью) и проверяет их
+import hmac
+import hashlib
+import secrets
+from config import SECURITY
+
+
+ALGORITHM = 'pbkdf2_sha256'
+
+
+def hash_password(password, iterations=None, salt=None):
+    """
+    Хеш пароля в виде строки 'pbkdf2_sha256$итерации$соль$хеш'.
+    Число итераций хранится в самой строке, поэтому его можно менять
+    в конфигурации: старые хеши остаются проверяемыми.
+    """
+    if iterations is None:
+        iterations = SECURITY['password_iterations']
+    if salt is None:
+        salt = secrets.token_bytes(SECURITY['salt_bytes'])
+
+    digest = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, iterations)
+    return f"{ALGORITHM}${iterations}${salt.hex()}${digest.hex()}"
+
+
+def parse_hash(stored):
+    # разбираем строку хеша; None - пароль хранится открытым текстом (старые записи)
+    parts = stored.split('$')
+    if len(parts) != 4 or parts[0] != ALGORITHM:
+        return None
+    try:
+        return int(parts[1]), bytes.fromhex(parts[2]), bytes.fromhex(parts[3])
+    except ValueError:
+        return None
+
+
+def verify_password(password, stored):
+    # возвращаем (пароль верный, запись нужно перехешировать)
+    parsed = parse_hash(stored)
+    if parsed is None:
+        ok = hmac.compare_digest(password.encode('utf-8'), stored.encode('utf-8'))
+        return ok, True
+
+    iterations, salt, expected = parsed
+    digest = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, iterations)
+    return hmac.compare_digest(digest, expected), iterations != SECURITY['password_iterations']
+
+
+def check_password(password, stored):
+    """
+    Проверка пароля для входа: (пароль верный, новый хеш или None).
+    Новый хеш считается сразу, если запись хранит открытый текст
+    или число итераций отличается от текущей настройки.
+    Функция долгая, поэтому вызывается в фоновом потоке.
+    """
+    ok, needs_rehash = verify_password(password, stored)
+    if ok and needs_rehash:
+        return True, hash_password(password)
+    return ok, None
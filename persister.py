@@ -0,0 +1,93 @@
+# модуль выполняет отложенную запись изменений в фоновом потоке
+import time
+import threading
+
+
+class WriteBehindPersister:
+    """
+    Фоновый писатель: изменения только помечают данные грязными,
+    а поток объединяет серию изменений за delay секунд в одну запись.
+    write - функция записи, возвращает True при успехе.
+    """
+    def __init__(self, write, delay=0.5, name="write-behind"):
+        self.write = write
+        self.delay = delay
+
+        # номер последнего изменения и номер изменения, на котором была последняя попытка записи
+        self.generation = 0
+        self.attempted = 0
+        self.written = 0
+        self.writes = 0
+
+        self._cond = threading.Condition()
+        self._flush_requested = False
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    @property
+    def dirty(self):
+        return self.written < self.generation
+
+    def mark_dirty(self):
+        # вызывается после каждого изменения; сама запись произойдет позже в фоне
+        with self._cond:
+            self.generation += 1
+            self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopped and self.attempted >= self.generation:
+                    self._cond.wait()
+                if self._stopped and self.attempted >= self.generation:
+                    return
+
+                # собираем изменения, пришедшие за delay после первого (или до flush)
+                deadline = time.monotonic() + self.delay
+                while not self._flush_requested and not self._stopped:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                self._flush_requested = False
+                generation = self.generation
+
+            try:
+                ok = self.write()
+            except Exception as e:
+                print(f"Ошибка фоновой записи: {e}")
+                ok = False
+
+            with self._cond:
+                self.attempted = generation
+                self.writes += 1
+                if ok:
+                    self.written = generation
+                self._cond.notify_all()
+
+    def flush(self, timeout=None):
+        # пишем накопленные изменения немедленно и ждем завершения записи
+        with self._cond:
+            target = self.generation
+            if self.written >= target:
+                return True
+            if not self._thread.is_alive():
+                return False
+
+            self._flush_requested = True
+            self._cond.notify_all()
+            # повторная попытка, если предыдущая запись была неудачной
+            if self.attempted >= target:
+                self.attempted = self.written
+            self._cond.wait_for(lambda: self.attempted >= target, timeout)
+            return self.written >= target
+
+    def close(self, timeout=None):
+        # дописываем остаток и останавливаем поток
+        ok = self.flush(timeout)
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        return ok
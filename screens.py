@@ -1,7 +1,11 @@
 # модуль содержит экраны авторизации, регистрации и стартовый экран
 import customtkinter as ctk
 from config import COLORS, FONTS, SIZES, EMOJI
-from utils import IconLoader
+from lazy import LazyAttr
+
+
+# загрузчик иконок (и pil с cairosvg за ним) подгружается при первом использовании
+IconLoader = LazyAttr('utils', 'IconLoader')
 
 
 class StartScreen(ctk.CTkFrame):
@@ -16,21 +20,13 @@ class StartScreen(ctk.CTkFrame):
         container = ctk.CTkFrame(self, fg_color="transparent")
         container.place(relx=0.5, rely=0.5, anchor="center")
         
-        # иконка игры
-        bricks_icon, _ = IconLoader.get_text_with_icon('bricks', '', size=(80, 80))
-        if bricks_icon:
-            icon_label = ctk.CTkLabel(
-                container,
-                text="",
-                image=bricks_icon
-            )
-        else:
-            icon_label = ctk.CTkLabel(
-                container,
-                text="🧱",
-                font=("SF Pro Display", 80)
-            )
-        icon_label.pack(pady=(0, SIZES['padding_lg']))
+        # иконка игры: сначала emoji, svg подставляется после загрузки IconLoader
+        self.icon_label = ctk.CTkLabel(
+            container,
+            text=EMOJI['bricks'],
+            font=("SF Pro Display", 80)
+        )
+        self.icon_label.pack(pady=(0, SIZES['padding_lg']))
         
         # заголовок приложения
         title = ctk.CTkLabel(
@@ -63,6 +59,14 @@ class StartScreen(ctk.CTkFrame):
             command=self.on_start
         )
         start_btn.pack()
+    
+    def load_icon(self):
+        # заменяем emoji на svg-иконку; вызывается на шаге фонового прогрева
+        if not self.winfo_exists():
+            return
+        bricks_icon, _ = IconLoader.get_text_with_icon('bricks', '', size=(80, 80))
+        if bricks_icon:
+            self.icon_label.configure(text="", image=bricks_icon)
 
 
 class LoginScreen(ctk.CTkFrame):
@@ -71,6 +75,7 @@ class LoginScreen(ctk.CTkFrame):
         super().__init__(parent, fg_color=COLORS['bg_primary'])
         self.on_login = on_login
         self.on_register = on_register
+        self.busy = False
         self.create_widgets()
     
     def create_widgets(self):
@@ -153,7 +158,7 @@ class LoginScreen(ctk.CTkFrame):
         self.error_label.pack(pady=(0, SIZES['padding_sm']))
         
         # кнопка входа
-        login_btn = ctk.CTkButton(
+        self.login_btn = ctk.CTkButton(
             content,
             text="Войти",
             font=FONTS['body_lg'],
@@ -164,7 +169,7 @@ class LoginScreen(ctk.CTkFrame):
             corner_radius=SIZES['border_radius_sm'],
             command=self.handle_login
         )
-        login_btn.pack(pady=(SIZES['padding_sm'], SIZES['padding_md']))
+        self.login_btn.pack(pady=(SIZES['padding_sm'], SIZES['padding_md']))
         
         # разделитель
         divider_frame = ctk.CTkFrame(content, fg_color="transparent")
@@ -207,6 +212,9 @@ class LoginScreen(ctk.CTkFrame):
     
     def handle_login(self):
         # получаем данные и передаем в callback
+        if self.busy:
+            return
+        
         login = self.login_entry.get().strip()
         password = self.password_entry.get()
         
@@ -216,6 +224,16 @@ class LoginScreen(ctk.CTkFrame):
         
         self.on_login(login, password)
     
+    def set_busy(self, busy):
+        # пока пароль проверяется в фоне, повторные нажатия игнорируются
+        self.busy = busy
+        self.login_btn.configure(
+            state="disabled" if busy else "normal",
+            text="Проверка..." if busy else "Войти"
+        )
+        if busy:
+            self.error_label.configure(text="")
+    
     def show_error(self, message):
         # отображаем сообщение об ошибке
         self.error_label.configure(text=message)
@@ -225,6 +243,11 @@ class LoginScreen(ctk.CTkFrame):
         self.login_entry.delete(0, 'end')
         self.password_entry.delete(0, 'end')
         self.error_label.configure(text="")
+    
+    def reset(self):
+        # экран показывается повторно: поля пустые, кнопка доступна
+        self.clear_fields()
+        self.set_busy(False)
 
 
 class RegisterScreen(ctk.CTkFrame):
@@ -233,6 +256,7 @@ class RegisterScreen(ctk.CTkFrame):
         super().__init__(parent, fg_color=COLORS['bg_primary'])
         self.on_register = on_register
         self.on_back = on_back
+        self.busy = False
         self.create_widgets()
     
     def create_widgets(self):
@@ -392,7 +416,7 @@ class RegisterScreen(ctk.CTkFrame):
         self.error_label.pack(pady=(0, SIZES['padding_sm']))
         
         # кнопка регистрации
-        register_btn = ctk.CTkButton(
+        self.register_btn = ctk.CTkButton(
             content,
             text="Зарегистрироваться",
             font=FONTS['body_lg'],
@@ -403,7 +427,7 @@ class RegisterScreen(ctk.CTkFrame):
             corner_radius=SIZES['border_radius_sm'],
             command=self.handle_register
         )
-        register_btn.pack(pady=(SIZES['padding_sm'], SIZES['padding_md']))
+        self.register_btn.pack(pady=(SIZES['padding_sm'], SIZES['padding_md']))
         
         # кнопка назад
         back_btn = ctk.CTkButton(
@@ -424,6 +448,9 @@ class RegisterScreen(ctk.CTkFrame):
     
     def handle_register(self):
         # собираем данные формы и передаем в callback
+        if self.busy:
+            return
+        
         login = self.login_entry.get().strip()
         email = self.email_entry.get().strip()
         password = self.password_entry.get()
@@ -436,6 +463,16 @@ class RegisterScreen(ctk.CTkFrame):
         
         self.on_register(login, password, email, gender, age_category)
     
+    def set_busy(self, busy):
+        # пока в фоне считается хеш пароля, кнопка регистрации недоступна
+        self.busy = busy
+        self.register_btn.configure(
+            state="disabled" if busy else "normal",
+            text="Регистрация..." if busy else "Зарегистрироваться"
+        )
+        if busy:
+            self.error_label.configure(text="")
+    
     def show_error(self, message):
         # отображаем сообщение об ошибке
         self.error_label.configure(text=message)
@@ -449,6 +486,11 @@ class RegisterScreen(ctk.CTkFrame):
         self.age_var.set("18-25")
         self.error_label.configure(text="")
     
+    def reset(self):
+        # экран показывается повторно: форма в исходном состоянии
+        self.clear_fields()
+        self.set_busy(False)
+    
     def darken_color(self, hex_color):
         # уменьшаем яркость цвета для эффекта hover
         hex_color = hex_color.lstrip('#')
@@ -0,0 +1,167 @@
+# модуль пакетно симулирует партии стратегий ai на массивах numpy
+import sys
+import json
+import argparse
+import numpy as np
+from config import BRICKS_GAME
+from engine import Rules
+from ai import HeuristicStrategy, solve
+
+
+class VectorPolicy:
+    # векторная политика: по массиву куч возвращает массив взятых кирпичей
+    def __init__(self, rules, size):
+        self.rules = rules
+        self.size = size
+
+    def __call__(self, piles, rng):
+        raise NotImplementedError
+
+
+class OptimalVectorPolicy(VectorPolicy):
+    # ход из таблицы идеальной игры - один индексный доступ на весь массив
+    def __init__(self, rules, size):
+        super().__init__(rules, size)
+        self.best = np.asarray(solve(rules, size).best[:size], dtype=np.int64)
+
+    def __call__(self, piles, rng):
+        return self.best[piles]
+
+
+class RandomVectorPolicy(VectorPolicy):
+    # как RandomStrategy: добираем остаток, иначе случайный допустимый ход
+    def __init__(self, rules, size):
+        super().__init__(rules, size)
+        moves = np.asarray(rules.moves, dtype=np.int64)
+        piles = np.arange(size)
+
+        # сколько ходов допустимо в каждой позиции (ходы отсортированы по возрастанию)
+        self.moves = moves
+        self.legal_count = np.searchsorted(moves, piles, side='right')
+        self.take_all = np.isin(piles, moves) & (not rules.misere)
+
+    def __call__(self, piles, rng):
+        choice = self.moves[rng.integers(0, self.legal_count[piles])]
+        return np.where(self.take_all[piles], piles, choice)
+
+
+class HeuristicVectorPolicy(VectorPolicy):
+    # как HeuristicStrategy: случайный ход из списка кандидатов позиции
+    def __init__(self, rules, size):
+        super().__init__(rules, size)
+        strategy = HeuristicStrategy(rules)
+        strategy.extend(size)
+
+        width = max(1, max(len(c) for c in strategy.candidates))
+        self.count = np.array([max(1, len(c)) for c in strategy.candidates], dtype=np.int64)
+        self.candidates = np.zeros((size, width), dtype=np.int64)
+        for n, candidates in enumerate(strategy.candidates):
+            self.candidates[n, :len(candidates)] = candidates
+
+    def __call__(self, piles, rng):
+        return self.candidates[piles, rng.integers(0, self.count[piles])]
+
+
+VECTOR_POLICIES = {
+    'random': RandomVectorPolicy,
+    'optimal': OptimalVectorPolicy,
+    'heuristic': HeuristicVectorPolicy,
+}
+
+
+def simulate(starts, first, second, rules, rng):
+    """
+    Играет партии со стартовыми кучами starts одновременно, шаг за шагом.
+    first и second - векторные политики первого и второго игрока.
+    Возвращает массив победителей: 0 - первый игрок, 1 - второй.
+    """
+    piles = np.array(starts, dtype=np.int64)
+    turn = np.zeros(len(piles), dtype=np.int8)
+    winner = np.full(len(piles), -1, dtype=np.int8)
+
+    min_move = rules.moves[0]
+    misere = 1 if rules.misere else 0
+    policies = (first, second)
+
+    # в стартовой куче меньше минимального хода партия уже окончена:
+    # первый игрок не может ходить, как если бы последним ходил второй
+    active = piles >= min_move
+    winner[~active] = 1 ^ misere
+
+    while active.any():
+        for side, policy in enumerate(policies):
+            idx = np.flatnonzero(active & (turn == side))
+            if idx.size:
+                piles[idx] -= policy(piles[idx], rng)
+
+        # кто не может ходить - проиграл (в мизере - наоборот)
+        finished = active & (piles < min_move)
+        winner[finished] = turn[finished] ^ misere
+        active &= ~finished
+        turn[active] ^= 1
+
+    return winner
+
+
+def win_rate_matrix(strategies, rules=None, games=10000, seed=None, min_bricks=None, max_bricks=None):
+    """
+    Для каждой упорядоченной пары стратегий (первая ходит первой) считает
+    долю побед первой стратегии по каждому стартовому размеру кучи.
+    Возвращает словарь {(первая, вторая): {размер: доля побед}}.
+    """
+    rules = rules or Rules.from_config()
+    # 0 - допустимый размер кучи, поэтому сравниваем с None
+    min_bricks = rules.min_bricks if min_bricks is None else min_bricks
+    max_bricks = rules.max_bricks if max_bricks is None else max_bricks
+    rng = np.random.default_rng(seed)
+
+    sizes = np.arange(min_bricks, max_bricks + 1)
+    starts = np.repeat(sizes, games)
+    policies = {name: VECTOR_POLICIES[name](rules, max_bricks + 1) for name in strategies}
+
+    results = {}
+    for first in strategies:
+        for second in strategies:
+            winner = simulate(starts, policies[first], policies[second], rules, rng)
+            first_wins = (winner == 0).reshape(len(sizes), games).mean(axis=1)
+            results[(first, second)] = dict(zip(sizes.tolist(), first_wins.tolist()))
+    return results
+
+
+def format_matrix(results):
+    # текстовая таблица: строки - пары стратегий, колонки - стартовые размеры
+    sizes = sorted(next(iter(results.values())))
+    lines = ["пара".ljust(24) + "".join(f"{size:>7}" for size in sizes)]
+    for (first, second), rates in results.items():
+        row = f"{first} vs {second}".ljust(24)
+        lines.append(row + "".join(f"{rates[size]:>7.2f}" for size in sizes))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Пакетная симуляция стратегий ai для игры «Кирпичи»")
+    parser.add_argument('--strategies', nargs='+', default=list(VECTOR_POLICIES), choices=list(VECTOR_POLICIES))
+    parser.add_argument('--games', type=int, default=10000, help="партий на каждый стартовый размер и пару")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--min-bricks', type=int, default=BRICKS_GAME['min_bricks'])
+    parser.add_argument('--max-bricks', type=int, default=BRICKS_GAME['max_bricks'])
+    parser.add_argument('--json', action='store_true', help="вывести результат в json")
+    args = parser.parse_args(argv)
+
+    results = win_rate_matrix(
+        args.strategies,
+        games=args.games,
+        seed=args.seed,
+        min_bricks=args.min_bricks,
+        max_bricks=args.max_bricks
+    )
+
+    if args.json:
+        print(json.dumps({f"{a}/{b}": rates for (a, b), rates in results.items()}, indent=2))
+    else:
+        print(format_matrix(results))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,249 @@
+# модуль читает и пишет компактный бинарный снапшот пользователей вместо users.json
+import os
+import sys
+import json
+import struct
+import argparse
+from array import array
+from journal import META_KEY, StatsJournal, write_json_atomic
+
+
+MAGIC = b'BRKU'
+VERSION = 1
+
+# заголовок: сигнатура, версия, флаги, число пользователей, число строк,
+# размер блока строк и индекс строки со служебными данными (_meta)
+HEADER = struct.Struct('<4sHHIIII')
+
+# флаг: строки разделены нулевым байтом и декодируются одним вызовом, без таблицы смещений
+FLAG_NUL_SEPARATED = 1
+
+# индекс строки для отсутствующего значения
+NONE = 0xFFFFFFFF
+MAX_STAT = 0xFFFFFFFF
+
+BINARY_EXTENSIONS = ('.bin',)
+
+STRING_FIELDS = ('password', 'email', 'gender', 'age_category', 'created_at')
+STAT_FIELDS = ('games', 'wins', 'losses')
+
+# колонки по 4 байта на пользователя: логин, строковые поля, прочие поля (json), статистика
+COLUMNS = ('login',) + STRING_FIELDS + ('extra',) + STAT_FIELDS
+
+# ключ в прочих полях для записи вообще без статистики
+NO_STATS = '\x00no_stats'
+
+
+def is_binary_path(path):
+    # бинарный снапшот определяем по расширению файла
+    return bool(path) and path.lower().endswith(BINARY_EXTENSIONS)
+
+
+def is_plain_stats(stats):
+    # статистика укладывается в колонки, если это ровно три неотрицательных целых
+    return (
+        isinstance(stats, dict)
+        and stats.keys() == set(STAT_FIELDS)
+        and all(type(stats[key]) is int and 0 <= stats[key] <= MAX_STAT for key in STAT_FIELDS)
+    )
+
+
+def dumps(users):
+    """
+    Упаковывает словарь пользователей в бинарный снапшот.
+    Повторяющиеся строки (пол, возраст, даты) хранятся один раз в таблице строк,
+    статистика - в колонках фиксированной ширины. Все, что не укладывается в колонки,
+    сохраняется как json в поле extra, поэтому преобразование без потерь.
+    """
+    strings = []
+    index = {}
+
+    def intern(value):
+        idx = index.get(value)
+        if idx is None:
+            idx = index[value] = len(strings)
+            strings.append(value)
+        return idx
+
+    meta = users.get(META_KEY)
+    meta_idx = NONE if meta is None else intern(json.dumps(meta, ensure_ascii=False))
+
+    columns = [array('I') for _ in COLUMNS]
+    count = 0
+    for login, data in users.items():
+        if login == META_KEY:
+            continue
+        count += 1
+
+        extra = {key: value for key, value in data.items() if key not in STRING_FIELDS and key != 'stats'}
+        row = [intern(login)]
+        for field in STRING_FIELDS:
+            value = data.get(field)
+            if isinstance(value, str):
+                row.append(intern(value))
+            else:
+                row.append(NONE)
+                if field in data:
+                    extra[field] = value
+
+        stats = data.get('stats')
+        if is_plain_stats(stats):
+            stat_values = [stats[key] for key in STAT_FIELDS]
+        else:
+            stat_values = [0, 0, 0]
+            if 'stats' in data:
+                extra['stats'] = stats
+            else:
+                extra[NO_STATS] = True
+
+        row.append(intern(json.dumps(extra, ensure_ascii=False)) if extra else NONE)
+        row.extend(stat_values)
+        for column, value in zip(columns, row):
+            column.append(value)
+
+    # обычно строки без нулевых байтов: тогда хватает разделителя,
+    # иначе пишем таблицу смещений
+    offsets = array('I')
+    if any('\0' in value for value in strings):
+        flags = 0
+        encoded = [value.encode('utf-8') for value in strings]
+        offsets.append(0)
+        for chunk in encoded:
+            offsets.append(offsets[-1] + len(chunk))
+        blob = b''.join(encoded)
+    else:
+        flags = FLAG_NUL_SEPARATED
+        blob = '\0'.join(strings).encode('utf-8')
+    padding = b'\0' * (-len(blob) % 4)
+
+    if sys.byteorder == 'big':
+        offsets.byteswap()
+        for column in columns:
+            column.byteswap()
+
+    header = HEADER.pack(MAGIC, VERSION, flags, count, len(strings), len(blob), meta_idx)
+    return b''.join([header, offsets.tobytes(), blob, padding] + [column.tobytes() for column in columns])
+
+
+def loads(data):
+    # распаковывает снапшот, прочитанный с диска одним блоком
+    magic, version, flags, count, string_count, blob_size, meta_idx = HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("Файл не является бинарным снапшотом пользователей")
+    if version != VERSION:
+        raise ValueError(f"Неподдерживаемая версия снапшота: {version}")
+
+    view = memoryview(data)
+    pos = HEADER.size
+
+    offsets = array('I')
+    if not flags & FLAG_NUL_SEPARATED:
+        offsets.frombytes(view[pos:pos + 4 * (string_count + 1)])
+        pos += 4 * (string_count + 1)
+
+    blob = bytes(view[pos:pos + blob_size])
+    pos += blob_size + (-blob_size % 4)
+
+    cells = array('I')
+    cells.frombytes(view[pos:pos + 4 * len(COLUMNS) * count])
+    if sys.byteorder == 'big':
+        offsets.byteswap()
+        cells.byteswap()
+
+    if flags & FLAG_NUL_SEPARATED:
+        strings = blob.decode('utf-8').split('\0') if string_count else []
+    else:
+        strings = [blob[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(string_count)]
+    columns = [cells[i * count:(i + 1) * count] for i in range(len(COLUMNS))]
+
+    users = {}
+    for login, password, email, gender, age, created, extra, games, wins, losses in zip(*columns):
+        if extra == NONE and max(password, email, gender, age, created) != NONE:
+            # обычная запись: все поля на месте
+            users[strings[login]] = {
+                'password': strings[password],
+                'email': strings[email],
+                'gender': strings[gender],
+                'age_category': strings[age],
+                'stats': {'games': games, 'wins': wins, 'losses': losses},
+                'created_at': strings[created]
+            }
+            continue
+
+        record = {}
+        for field, idx in (('password', password), ('email', email), ('gender', gender), ('age_category', age)):
+            if idx != NONE:
+                record[field] = strings[idx]
+        record['stats'] = {'games': games, 'wins': wins, 'losses': losses}
+        if created != NONE:
+            record['created_at'] = strings[created]
+
+        if extra != NONE:
+            fields = json.loads(strings[extra])
+            if fields.pop(NO_STATS, False):
+                del record['stats']
+            record.update(fields)
+        users[strings[login]] = record
+
+    if meta_idx != NONE:
+        users[META_KEY] = json.loads(strings[meta_idx])
+    return users
+
+
+def write_binary_atomic(path, users):
+    # пишем снапшот во временный файл и атомарно подменяем исходный
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(dumps(users))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def read_users_file(path):
+    # читаем пользователей из json или бинарного снапшота по расширению
+    if is_binary_path(path):
+        with open(path, 'rb') as f:
+            return loads(f.read())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_users_file(path, users):
+    # атомарно пишем пользователей в формате, заданном расширением
+    if is_binary_path(path):
+        write_binary_atomic(path, users)
+    else:
+        write_json_atomic(path, users)
+
+
+def convert(source, target, journal_suffix='.journal'):
+    """
+    Преобразование между users.json и бинарным снапшотом в любую сторону.
+    Если у исходного файла есть журнал, его записи вливаются в результат
+    (сам журнал только читается), иначе данные переносятся как есть.
+    """
+    users = read_users_file(source) if os.path.exists(source) else {}
+    if os.path.exists(source + journal_suffix):
+        StatsJournal(source, suffix=journal_suffix).replay(users)
+    write_users_file(target, users)
+    return sum(1 for login in users if login != META_KEY)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Преобразование users.json <-> бинарный снапшот (.bin)")
+    parser.add_argument('source', help="исходный файл (.json или .bin)")
+    parser.add_argument('target', help="файл результата (.json или .bin)")
+    args = parser.parse_args(argv)
+
+    try:
+        count = convert(args.source, args.target)
+    except Exception as e:
+        print(f"Ошибка преобразования: {e}")
+        return 1
+    print(f"Преобразовано пользователей: {count}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
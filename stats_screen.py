@@ -1,7 +1,9 @@
 # модуль отображает таблицу лидеров со статистикой игроков
 import customtkinter as ctk
-from config import COLORS, FONTS, SIZES, get_base_dir
+from config import COLORS, FONTS, SIZES, LEADERBOARD, get_base_dir
 from utils import IconLoader
+from widgets import VirtualTable
+from timers import TimerRegistry
 
 
 class StatsScreen(ctk.CTkToplevel):
@@ -9,6 +11,7 @@ class StatsScreen(ctk.CTkToplevel):
     def __init__(self, parent, auth_manager):
         super().__init__(parent)
         self.auth_manager = auth_manager
+        self.timers = TimerRegistry(self)
         
         # настройка окна
         self.title("Таблица лидеров")
@@ -56,13 +59,32 @@ class StatsScreen(ctk.CTkToplevel):
         )
         title_label.pack(anchor="w")
         
-        subtitle_label = ctk.CTkLabel(
+        self.subtitle_label = ctk.CTkLabel(
             header_frame,
             text="Рейтинг игроков по количеству побед",
             font=FONTS['body_md'],
             text_color=COLORS['text_muted']
         )
-        subtitle_label.pack(anchor="w", pady=(4, 0))
+        self.subtitle_label.pack(anchor="w", pady=(4, 0))
+        
+        self.current_user = self.auth_manager.get_current_username()
+        
+        # общее число игроков известно без выборки всей таблицы
+        total_rows = self.auth_manager.get_leaderboard_size()
+        
+        # поиск по началу логина; запрос уходит после паузы в наборе
+        self.query = ""
+        if total_rows:
+            self.search_entry = ctk.CTkEntry(
+                main_frame,
+                font=FONTS['body_md'],
+                height=40,
+                fg_color=COLORS['bg_secondary'],
+                border_color=COLORS['border'],
+                placeholder_text="Поиск игрока по логину"
+            )
+            self.search_entry.pack(fill="x", pady=(0, SIZES['padding_md']))
+            self.search_entry.bind('<KeyRelease>', self.on_search_changed)
         
         # карточка с таблицей
         table_card = ctk.CTkFrame(
@@ -110,125 +132,42 @@ class StatsScreen(ctk.CTkToplevel):
             )
             label.grid(row=0, column=col, padx=SIZES['padding_sm'], pady=SIZES['padding_sm'], sticky="ew")
         
-        # прокручиваемая область с данными
-        scroll_frame = ctk.CTkScrollableFrame(
-            table_card,
-            fg_color="transparent"
-        )
-        scroll_frame.pack(fill="both", expand=True, padx=SIZES['padding_md'], pady=SIZES['padding_md'])
-        
-        # настройка колонок для строк данных (должны совпадать с заголовками)
-        scroll_frame.grid_columnconfigure(0, minsize=60, weight=0)
-        scroll_frame.grid_columnconfigure(1, minsize=200, weight=1)
-        scroll_frame.grid_columnconfigure(2, minsize=100, weight=0)
-        scroll_frame.grid_columnconfigure(3, minsize=100, weight=0)
-        scroll_frame.grid_columnconfigure(4, minsize=120, weight=0)
-        scroll_frame.grid_columnconfigure(5, minsize=130, weight=0)
-        
-        # получаем данные лидеров
-        leaderboard = self.auth_manager.get_leaderboard()
-        current_user = self.auth_manager.get_current_username()
-        
-        if not leaderboard:
+        if not total_rows:
             no_data_label = ctk.CTkLabel(
-                scroll_frame,
+                table_card,
                 text="Пока нет статистики. Сыграйте первую игру!",
                 font=FONTS['body_lg'],
                 text_color=COLORS['text_muted']
             )
-            no_data_label.grid(row=0, column=0, columnspan=6, pady=SIZES['padding_xl'])
+            no_data_label.pack(pady=SIZES['padding_xl'])
         else:
-            # выводим строки с данными игроков
-            for row_idx, player in enumerate(leaderboard):
-                position = row_idx + 1  # позиция начинается с 1
-                is_current = player['login'] == current_user
-                
-                # медали для топ-3
-                if position == 1:
-                    medal = "🥇"
-                elif position == 2:
-                    medal = "🥈"
-                elif position == 3:
-                    medal = "🥉"
-                else:
-                    medal = str(position)
-                
-                # фон для текущего пользователя
-                bg_color = COLORS['primary'] if is_current else COLORS['bg_secondary']
-                text_color = "white" if is_current else COLORS['text_primary']
-                
-                # номер позиции
-                pos_label = ctk.CTkLabel(
-                    scroll_frame,
-                    text=medal,
-                    font=FONTS['body_lg'],
-                    text_color=text_color,
-                    fg_color=bg_color,
-                    corner_radius=SIZES['border_radius_sm'],
-                    anchor="center"
-                )
-                pos_label.grid(row=row_idx, column=0, padx=2, pady=2, sticky="ew")
-                
-                # логин игрока
-                login_text = f"{player['login']} (Вы)" if is_current else player['login']
-                login_label = ctk.CTkLabel(
-                    scroll_frame,
-                    text=login_text,
-                    font=FONTS['body_lg'],
-                    text_color=text_color,
-                    fg_color=bg_color,
-                    corner_radius=SIZES['border_radius_sm'],
-                    anchor="w"
-                )
-                login_label.grid(row=row_idx, column=1, padx=2, pady=2, sticky="ew")
-                
-                # статистика - игры
-                games_label = ctk.CTkLabel(
-                    scroll_frame,
-                    text=str(player['games']),
-                    font=FONTS['body_lg'],
-                    text_color=text_color,
-                    fg_color=bg_color,
-                    corner_radius=SIZES['border_radius_sm'],
-                    anchor="center"
-                )
-                games_label.grid(row=row_idx, column=2, padx=2, pady=2, sticky="ew")
-                
-                # статистика - победы
-                wins_label = ctk.CTkLabel(
-                    scroll_frame,
-                    text=str(player['wins']),
-                    font=FONTS['body_lg'],
-                    text_color=text_color,
-                    fg_color=bg_color,
-                    corner_radius=SIZES['border_radius_sm'],
-                    anchor="center"
-                )
-                wins_label.grid(row=row_idx, column=3, padx=2, pady=2, sticky="ew")
-                
-                # статистика - поражения
-                losses_label = ctk.CTkLabel(
-                    scroll_frame,
-                    text=str(player['losses']),
-                    font=FONTS['body_lg'],
-                    text_color=text_color,
-                    fg_color=bg_color,
-                    corner_radius=SIZES['border_radius_sm'],
-                    anchor="center"
-                )
-                losses_label.grid(row=row_idx, column=4, padx=2, pady=2, sticky="ew")
-                
-                # процент побед
-                winrate_label = ctk.CTkLabel(
-                    scroll_frame,
-                    text=f"{player['winrate']:.1f}%",
-                    font=FONTS['body_lg'],
-                    text_color=text_color,
-                    fg_color=bg_color,
-                    corner_radius=SIZES['border_radius_sm'],
-                    anchor="center"
-                )
-                winrate_label.grid(row=row_idx, column=5, padx=2, pady=2, sticky="ew")
+            # виджеты создаются только для видимых строк и переиспользуются при прокрутке
+            # (колонки должны совпадать с заголовками)
+            self.table = VirtualTable(
+                table_card,
+                columns=[
+                    (60, 0, "center"),
+                    (200, 1, "w"),
+                    (100, 0, "center"),
+                    (100, 0, "center"),
+                    (120, 0, "center"),
+                    (130, 0, "center")
+                ],
+                fetch_rows=self.auth_manager.get_leaderboard,
+                total_rows=total_rows,
+                format_row=self.format_row,
+                row_height=LEADERBOARD['row_height'],
+                overscan=LEADERBOARD['overscan']
+            )
+            self.table.pack(fill="both", expand=True, padx=SIZES['padding_md'], pady=SIZES['padding_md'])
+            
+            # подпись поверх таблицы, если по запросу никого нет
+            self.not_found_label = ctk.CTkLabel(
+                table_card,
+                text="Игроки не найдены",
+                font=FONTS['body_lg'],
+                text_color=COLORS['text_muted']
+            )
         
         # кнопка закрытия
         close_btn = ctk.CTkButton(
@@ -244,4 +183,69 @@ class StatsScreen(ctk.CTkToplevel):
             corner_radius=SIZES['border_radius_sm'],
             command=self.destroy
         )
-        close_btn.pack(fill="x")
\ No newline at end of file
+        close_btn.pack(fill="x")
+    
+    def on_search_changed(self, *args):
+        # каждое нажатие откладывает поиск заново, поэтому запрос один на серию нажатий
+        self.timers.after(LEADERBOARD['search_debounce'], self.apply_search, key='search')
+    
+    def apply_search(self):
+        # показываем результаты поиска страницами, как и полную таблицу
+        query = self.search_entry.get().strip()
+        if query == self.query:
+            return
+        self.query = query
+        
+        total = self.auth_manager.count_players(query)
+        self.table.set_source(
+            lambda offset, limit: self.auth_manager.search_players(query, offset, limit),
+            total
+        )
+        
+        if query:
+            self.subtitle_label.configure(text=f"Найдено игроков: {total}")
+        else:
+            self.subtitle_label.configure(text="Рейтинг игроков по количеству побед")
+        
+        if total:
+            self.not_found_label.place_forget()
+        else:
+            self.not_found_label.place(relx=0.5, rely=0.5, anchor="center")
+    
+    def destroy(self):
+        # отложенный поиск не должен сработать после закрытия окна
+        self.timers.cancel_all()
+        super().destroy()
+    
+    def format_row(self, row_idx, player):
+        # готовим тексты и цвета строки таблицы для игрока на позиции row_idx
+        # (в результатах поиска - общее место игрока, если хранилище его знает)
+        position = player.get('rank', row_idx + 1)  # позиция начинается с 1
+        is_current = player['login'] == self.current_user
+        
+        # медали для топ-3
+        if position is None:
+            medal = "—"
+        elif position == 1:
+            medal = "🥇"
+        elif position == 2:
+            medal = "🥈"
+        elif position == 3:
+            medal = "🥉"
+        else:
+            medal = str(position)
+        
+        # фон для текущего пользователя
+        bg_color = COLORS['primary'] if is_current else COLORS['bg_secondary']
+        text_color = "white" if is_current else COLORS['text_primary']
+        
+        login_text = f"{player['login']} (Вы)" if is_current else player['login']
+        texts = (
+            medal,
+            login_text,
+            str(player['games']),
+            str(player['wins']),
+            str(player['losses']),
+            f"{player['winrate']:.1f}%"
+        )
+        return texts, bg_color, text_color
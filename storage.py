@@ -0,0 +1,881 @@
+# модуль содержит сменные хранилища пользователей: json-файл, шарды и базу sqlite
+import os
+import sys
+import json
+import zlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from journal import META_KEY, StatsJournal, apply_record, write_json_atomic
+from snapshot import read_users_file, write_users_file
+from persister import WriteBehindPersister
+from leaderboard import LeaderboardIndex, PREFIX_END, make_row
+from user_index import UserIndex, login_key, email_key
+
+
+# поля, по которым можно строить таблицу лидеров
+LEADERBOARD_KEYS = ('wins', 'games', 'winrate')
+
+# операции журнала, меняющие таблицу лидеров (смена пароля ее не трогает)
+RANKED_OPS = ('register', 'result')
+
+SQLITE_EXTENSIONS = ('.db', '.sqlite', '.sqlite3')
+
+
+def check_sort_key(sort_by):
+    # все хранилища одинаково отвечают на неизвестный ключ сортировки
+    if sort_by not in LEADERBOARD_KEYS:
+        raise ValueError(f"Неизвестный ключ сортировки: {sort_by}")
+
+
+class UserStorage:
+    # общий интерфейс хранилища, через который работает AuthManager
+    def load(self):
+        # читаем данные с диска
+        raise NotImplementedError
+
+    def save(self):
+        # гарантируем, что все изменения записаны на диск
+        raise NotImplementedError
+
+    def get(self, login):
+        # возвращаем запись пользователя или None
+        raise NotImplementedError
+
+    def exists(self, login):
+        return self.get(login) is not None
+
+    def find_login(self, login):
+        # зарегистрированный логин, совпадающий с login без учета регистра, или None
+        raise NotImplementedError
+
+    def find_email(self, email):
+        # логин пользователя с таким email (без учета регистра) или None
+        raise NotImplementedError
+
+    def add(self, login, record):
+        # добавляем нового пользователя, возвращаем успех записи
+        raise NotImplementedError
+
+    def record_result(self, login, result):
+        # учитываем результат игры пользователя
+        raise NotImplementedError
+
+    def set_password(self, login, password_hash):
+        # заменяем хеш пароля пользователя
+        raise NotImplementedError
+
+    def leaderboard(self, offset=0, limit=None, sort_by='wins'):
+        # возвращаем страницу отсортированной по убыванию таблицы лидеров;
+        # sort_by - один из LEADERBOARD_KEYS, иначе ValueError
+        raise NotImplementedError
+
+    def search(self, prefix, offset=0, limit=None):
+        # страница игроков с логином на prefix в порядке таблицы лидеров
+        raise NotImplementedError
+
+    def search_count(self, prefix):
+        # сколько игроков с логином на prefix
+        raise NotImplementedError
+
+    def count(self):
+        # количество зарегистрированных пользователей
+        raise NotImplementedError
+
+    def flush(self):
+        # дожидаемся записи отложенных изменений на диск
+        return True
+
+    def close(self):
+        pass
+
+
+class JsonStorage(UserStorage):
+    # все пользователи в памяти, на диске - users.json и, опционально, журнал
+    def __init__(self, users_file, journal=False, journal_suffix='.journal', compact_threshold=500,
+                 write_behind=False, write_delay=0.5):
+        self.users_file = users_file
+        self.users = {}
+        self.ranking = LeaderboardIndex()
+        self.index = UserIndex()
+
+        # в режиме журнала результаты игр дописываются отдельными записями
+        self.journal = None
+        if journal:
+            self.journal = StatsJournal(
+                users_file,
+                suffix=journal_suffix,
+                compact_threshold=compact_threshold,
+                write_file=write_users_file
+            )
+
+        # при отложенной записи commit только помечает изменения, а пишет фоновый поток
+        self.lock = threading.Lock()
+        self.pending_records = []
+        self.persister = None
+        if write_behind:
+            self.persister = WriteBehindPersister(self.write_pending, delay=write_delay, name="users-writer")
+
+    def load(self):
+        # загружаем список пользователей из json (или бинарного снапшота) и доигрываем журнал
+        users = {}
+        if os.path.exists(self.users_file):
+            try:
+                users = read_users_file(self.users_file)
+            except Exception as e:
+                print(f"Ошибка загрузки пользователей: {e}")
+                users = {}
+
+        if self.journal:
+            try:
+                self.journal.replay(users)
+            except Exception as e:
+                print(f"Ошибка чтения журнала: {e}")
+        # снапшот, записанный в режиме журнала, содержит служебную запись - это не пользователь
+        users.pop(META_KEY, None)
+
+        self.users = users
+        self.ranking.build(users)
+        self.index.build(users)
+
+        # накопленный при прошлых запусках журнал сворачиваем сразу
+        if self.journal and self.journal.pending:
+            self.journal.compact_async(self.users)
+        return users
+
+    def save(self):
+        # сохраняем данные всех пользователей в файл
+        if self.persister:
+            return self.flush()
+        try:
+            if self.journal:
+                # снапшот помечается номером журнала, чтобы записи не применились дважды
+                self.journal.write_snapshot(self.users)
+                return True
+            write_users_file(self.users_file, self.users)
+            return True
+        except Exception as e:
+            print(f"Ошибка сохранения пользователей: {e}")
+            return False
+
+    def append_to_journal(self, record):
+        # дописываем изменение в журнал и при необходимости запускаем сжатие
+        try:
+            self.journal.append(record)
+        except Exception as e:
+            print(f"Ошибка записи журнала: {e}")
+            return False
+
+        if self.journal.needs_compaction():
+            self.journal.compact_async(self.users)
+        return True
+
+    def apply(self, record):
+        # изменение в памяти: данные пользователя и таблица лидеров
+        apply_record(self.users, record)
+        login = record['login']
+        if record['op'] in RANKED_OPS:
+            self.ranking.update(login, self.users[login]['stats'])
+        if record['op'] == 'register':
+            self.index.add(login, record['data'])
+
+    def commit(self, record):
+        # применяем изменение в памяти и фиксируем его на диске
+        if self.persister:
+            with self.lock:
+                self.apply(record)
+                if self.journal:
+                    self.pending_records.append(record)
+            self.persister.mark_dirty()
+            return True
+
+        self.apply(record)
+        if self.journal:
+            return self.append_to_journal(record)
+        return self.save()
+
+    def write_pending(self):
+        # выполняется в потоке записи: серия изменений превращается в одну запись на диск
+        with self.lock:
+            records, self.pending_records = self.pending_records, []
+            # копия под блокировкой соответствует ровно тем записям, что забраны из очереди;
+            # записи пользователей копируются тоже: результаты меняют их после снятия блокировки
+            snapshot = None
+            if not self.journal or self.journal.pending + len(records) >= self.journal.compact_threshold:
+                snapshot = {login: dict(data) for login, data in self.users.items()}
+
+        if not self.journal:
+            write_users_file(self.users_file, snapshot)
+            return True
+
+        try:
+            self.journal.append_many(records)
+        except Exception:
+            # возвращаем записи в очередь, чтобы повторить при следующей записи
+            with self.lock:
+                self.pending_records[:0] = records
+            raise
+
+        if snapshot is not None:
+            # журнал пишет только этот поток, поэтому его номер совпадает с копией
+            self.journal.write_snapshot(snapshot, self.journal.seq)
+            self.journal.pending = 0
+        return True
+
+    def get(self, login):
+        return self.users.get(login)
+
+    def exists(self, login):
+        return login in self.users
+
+    def find_login(self, login):
+        return self.index.find_login(login)
+
+    def find_email(self, email):
+        return self.index.find_email(email)
+
+    def add(self, login, record):
+        return self.commit({'op': 'register', 'login': login, 'data': record})
+
+    def record_result(self, login, result):
+        if login not in self.users:
+            return False
+        return self.commit({'op': 'result', 'login': login, 'result': result})
+
+    def set_password(self, login, password_hash):
+        if login not in self.users:
+            return False
+        return self.commit({'op': 'password', 'login': login, 'password': password_hash})
+
+    def leaderboard(self, offset=0, limit=None, sort_by='wins'):
+        check_sort_key(sort_by)
+        if sort_by == 'wins':
+            return self.ranking.page(offset, limit)
+
+        # для прочих ключей индекса нет - сортируем всю таблицу
+        leaderboard = [
+            make_row(login, data['stats']['games'], data['stats']['wins'], data['stats']['losses'])
+            for login, data in self.users.items()
+        ]
+        leaderboard.sort(key=lambda x: (-x[sort_by], x['login']))
+        end = None if limit is None else offset + limit
+        return leaderboard[offset:end]
+
+    def search(self, prefix, offset=0, limit=None):
+        return self.ranking.search(prefix, offset, limit)
+
+    def search_count(self, prefix):
+        return self.ranking.search_count(prefix)
+
+    def count(self):
+        return len(self.users)
+
+    def flush(self):
+        if self.persister:
+            return self.persister.flush()
+        return True
+
+    def close(self):
+        if self.persister:
+            self.persister.close()
+        if self.journal:
+            self.journal.close()
+
+
+class ShardedStorage(UserStorage):
+    # пользователи разбиты по хешу логина на несколько файлов; в памяти - только нужные шарды
+    MANIFEST = 'shards.json'
+
+    def __init__(self, shard_dir, shards=16, max_loaded=4, extension='.json',
+                 write_behind=False, write_delay=0.5):
+        self.shard_dir = shard_dir
+        self.shards = shards
+        self.max_loaded = max_loaded
+        self.extension = extension
+
+        # загруженные шарды в порядке использования и шарды с незаписанными изменениями
+        self.loaded = OrderedDict()
+        self.dirty = set()
+        # для загруженных шардов: ключ логина без учета регистра -> логин
+        self.login_keys = {}
+        self.counts = [0] * shards
+        self.counts_dirty = False
+        # индекс email тоже разбит на файлы (по хешу email): ключ email -> логин
+        self.email_loaded = OrderedDict()
+        self.email_dirty = set()
+        # таблица лидеров строится только при первом запросе, обходом всех шардов
+        self.ranking = None
+
+        self.lock = threading.RLock()
+        self.persister = None
+        if write_behind:
+            self.persister = WriteBehindPersister(self.write_dirty, delay=write_delay, name="shards-writer")
+
+    def shard_of(self, login):
+        # стабильный между запусками хеш (встроенный hash() для строк случаен)
+        return zlib.crc32(login.casefold().encode('utf-8')) % self.shards
+
+    def shard_path(self, n):
+        return os.path.join(self.shard_dir, f"shard_{n:03d}{self.extension}")
+
+    def email_shard_of(self, email):
+        return zlib.crc32(email_key(email).encode('utf-8')) % self.shards
+
+    def email_path(self, n):
+        return os.path.join(self.shard_dir, f"emails_{n:03d}.json")
+
+    def load(self):
+        # читаем только манифест: число шардов и пользователей в каждом
+        os.makedirs(self.shard_dir, exist_ok=True)
+        manifest_path = os.path.join(self.shard_dir, self.MANIFEST)
+        if os.path.exists(manifest_path):
+            try:
+                with open(manifest_path, 'r', encoding='utf-8') as f:
+                    manifest = json.load(f)
+                # раскладка определяется уже записанными данными, а не конфигурацией
+                self.shards = manifest['shards']
+                self.extension = manifest.get('extension', self.extension)
+                self.counts = manifest['counts']
+                if not manifest.get('email_index'):
+                    # каталог создан до появления индекса email
+                    self.build_email_index()
+            except Exception as e:
+                print(f"Ошибка чтения манифеста шардов: {e}")
+        else:
+            # манифеста нет (первый запуск или он потерян) - пересчитываем по файлам
+            self.counts = [len(self.read_shard(n)) for n in range(self.shards)]
+            self.build_email_index()
+        return None
+
+    def build_email_index(self):
+        # однократно раскладываем email всех пользователей по файлам индекса, читая шарды по одному
+        buckets = [{} for _ in range(self.shards)]
+        for n in range(self.shards):
+            for login, record in self.read_shard(n).items():
+                email = record.get('email')
+                if email:
+                    buckets[self.email_shard_of(email)].setdefault(email_key(email), login)
+
+        with self.lock:
+            for n, bucket in enumerate(buckets):
+                self.email_loaded[n] = bucket
+                self.email_dirty.add(n)
+                self.write_email_shard(n)
+                del self.email_loaded[n]
+            self.counts_dirty = True
+            self.write_dirty()
+
+    def read_shard(self, n):
+        path = self.shard_path(n)
+        if not os.path.exists(path):
+            return {}
+        try:
+            return read_users_file(path)
+        except Exception as e:
+            print(f"Ошибка загрузки шарда {n}: {e}")
+            return {}
+
+    def shard(self, n):
+        # шард из кэша или с диска; давно не использованные вытесняются
+        with self.lock:
+            users = self.loaded.get(n)
+            if users is not None:
+                self.loaded.move_to_end(n)
+                return users
+
+            users = self.loaded[n] = self.read_shard(n)
+            keys = self.login_keys[n] = {}
+            for login in users:
+                keys.setdefault(login_key(login), login)
+            while len(self.loaded) > self.max_loaded:
+                old = next(iter(self.loaded))
+                if old in self.dirty:
+                    # незаписанный шард перед вытеснением сохраняем
+                    self.write_shard(old)
+                del self.loaded[old]
+                del self.login_keys[old]
+            return users
+
+    def write_shard(self, n):
+        write_users_file(self.shard_path(n), self.loaded[n])
+        self.dirty.discard(n)
+
+    def read_email_shard(self, n):
+        path = self.email_path(n)
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Ошибка загрузки индекса email {n}: {e}")
+            return {}
+
+    def email_shard(self, n):
+        # файл индекса email из кэша или с диска, вытеснение как у шардов
+        with self.lock:
+            emails = self.email_loaded.get(n)
+            if emails is not None:
+                self.email_loaded.move_to_end(n)
+                return emails
+
+            emails = self.email_loaded[n] = self.read_email_shard(n)
+            while len(self.email_loaded) > self.max_loaded:
+                old = next(iter(self.email_loaded))
+                if old in self.email_dirty:
+                    self.write_email_shard(old)
+                del self.email_loaded[old]
+            return emails
+
+    def write_email_shard(self, n):
+        write_json_atomic(self.email_path(n), self.email_loaded[n])
+        self.email_dirty.discard(n)
+
+    def index_email(self, login, record):
+        # добавляем email нового пользователя в его файл индекса
+        email = record.get('email')
+        if not email:
+            return
+        n = self.email_shard_of(email)
+        with self.lock:
+            emails = self.email_shard(n)
+            if email_key(email) not in emails:
+                emails[email_key(email)] = login
+                self.email_dirty.add(n)
+
+    def write_dirty(self):
+        # пишем все измененные шарды и манифест; шарды маленькие, поэтому под блокировкой
+        with self.lock:
+            for n in sorted(self.dirty):
+                self.write_shard(n)
+            for n in sorted(self.email_dirty):
+                self.write_email_shard(n)
+            # шард мог быть записан при вытеснении, а манифест - еще нет
+            if not self.counts_dirty:
+                return True
+            self.counts_dirty = False
+            write_json_atomic(os.path.join(self.shard_dir, self.MANIFEST), {
+                'shards': self.shards,
+                'extension': self.extension,
+                'counts': self.counts,
+                'email_index': True
+            })
+        return True
+
+    def save(self):
+        try:
+            if self.persister:
+                return self.flush()
+            return self.write_dirty()
+        except Exception as e:
+            print(f"Ошибка сохранения пользователей: {e}")
+            return False
+
+    def commit(self, record):
+        # изменение затрагивает ровно один шард
+        login = record['login']
+        n = self.shard_of(login)
+        with self.lock:
+            users = self.shard(n)
+            if record['op'] == 'register':
+                self.counts[n] += 1
+                self.counts_dirty = True
+                self.login_keys[n].setdefault(login_key(login), login)
+            apply_record(users, record)
+            if self.ranking is not None and record['op'] in RANKED_OPS:
+                self.ranking.update(login, users[login]['stats'])
+            if record['op'] == 'register':
+                self.index_email(login, record['data'])
+            self.dirty.add(n)
+
+        if self.persister:
+            self.persister.mark_dirty()
+            return True
+        return self.save()
+
+    def get(self, login):
+        return self.shard(self.shard_of(login)).get(login)
+
+    def exists(self, login):
+        return login in self.shard(self.shard_of(login))
+
+    def find_login(self, login):
+        # шард выбирается по логину без учета регистра, поэтому все варианты написания в одном шарде
+        n = self.shard_of(login)
+        with self.lock:
+            if login in self.shard(n):
+                return login
+            return self.login_keys[n].get(login_key(login))
+
+    def find_email(self, email):
+        # читается один файл индекса email, а не все шарды
+        return self.email_shard(self.email_shard_of(email)).get(email_key(email))
+
+    def add(self, login, record):
+        return self.commit({'op': 'register', 'login': login, 'data': record})
+
+    def record_result(self, login, result):
+        if not self.exists(login):
+            return False
+        return self.commit({'op': 'result', 'login': login, 'result': result})
+
+    def set_password(self, login, password_hash):
+        if not self.exists(login):
+            return False
+        return self.commit({'op': 'password', 'login': login, 'password': password_hash})
+
+    def get_ranking(self):
+        # строим индекс, читая шарды по одному; в кэш шардов они не попадают.
+        # сам индекс (логин и счетчики каждого пользователя) остается в памяти до конца сессии
+        with self.lock:
+            if self.ranking is None:
+                def items():
+                    for n in range(self.shards):
+                        users = self.loaded.get(n)
+                        if users is None:
+                            users = self.read_shard(n)
+                        for login, data in users.items():
+                            yield login, data['stats']
+
+                self.ranking = LeaderboardIndex()
+                self.ranking.build_from_stats(items())
+            return self.ranking
+
+    def leaderboard(self, offset=0, limit=None, sort_by='wins'):
+        check_sort_key(sort_by)
+        ranking = self.get_ranking()
+        if sort_by == 'wins':
+            return ranking.page(offset, limit)
+
+        leaderboard = ranking.rows()
+        leaderboard.sort(key=lambda x: (-x[sort_by], x['login']))
+        end = None if limit is None else offset + limit
+        return leaderboard[offset:end]
+
+    def search(self, prefix, offset=0, limit=None):
+        return self.get_ranking().search(prefix, offset, limit)
+
+    def search_count(self, prefix):
+        return self.get_ranking().search_count(prefix)
+
+    def count(self):
+        return sum(self.counts)
+
+    def flush(self):
+        if self.persister:
+            return self.persister.flush()
+        return self.write_dirty()
+
+    def close(self):
+        if self.persister:
+            self.persister.close()
+        else:
+            self.write_dirty()
+
+
+class SqliteStorage(UserStorage):
+    # пользователи лежат в таблице sqlite, выборки идут по индексам
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS users (
+            login TEXT PRIMARY KEY,
+            password TEXT NOT NULL,
+            email TEXT NOT NULL,
+            gender TEXT,
+            age_category TEXT,
+            created_at TEXT,
+            games INTEGER NOT NULL DEFAULT 0,
+            wins INTEGER NOT NULL DEFAULT 0,
+            losses INTEGER NOT NULL DEFAULT 0,
+            winrate REAL NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS idx_users_wins ON users (wins DESC, login);
+        CREATE INDEX IF NOT EXISTS idx_users_games ON users (games DESC, login);
+        CREATE INDEX IF NOT EXISTS idx_users_winrate ON users (winrate DESC, login);
+    """
+
+    # ключи поиска без учета регистра считаются в python (NOCASE в sqlite понимает только латиницу);
+    # в базах старой версии колонки добавляются при открытии
+    KEY_COLUMNS = (('login_key', 'login', login_key), ('email_key', 'email', email_key))
+    KEY_INDEXES = """
+        CREATE INDEX IF NOT EXISTS idx_users_login_key ON users (login_key);
+        CREATE INDEX IF NOT EXISTS idx_users_email_key ON users (email_key);
+    """
+
+    COLUMNS = 'login, password, email, gender, age_category, created_at, games, wins, losses, winrate'
+    INSERT_INTO = f'INTO users ({COLUMNS}, login_key, email_key) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)'
+
+    def __init__(self, db_file):
+        self.users_file = db_file
+        self.conn = None
+
+    def load(self):
+        # открываем базу и создаем таблицу с индексами при первом запуске
+        if self.conn is None:
+            self.conn = sqlite3.connect(self.users_file)
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('PRAGMA synchronous=NORMAL')
+            self.conn.executescript(self.SCHEMA)
+            self.add_key_columns()
+            self.conn.executescript(self.KEY_INDEXES)
+        return self.count()
+
+    def add_key_columns(self):
+        # однократное обновление схемы: колонки ключей поиска и их заполнение
+        existing = {row[1] for row in self.conn.execute('PRAGMA table_info(users)')}
+        with self.conn:
+            for column, source, make_key in self.KEY_COLUMNS:
+                if column in existing:
+                    continue
+                self.conn.execute(f'ALTER TABLE users ADD COLUMN {column} TEXT')
+                rows = self.conn.execute(f'SELECT login, {source} FROM users').fetchall()
+                self.conn.executemany(
+                    f'UPDATE users SET {column} = ? WHERE login = ?',
+                    ((make_key(value), login) for login, value in rows)
+                )
+
+    def save(self):
+        try:
+            self.conn.commit()
+            return True
+        except sqlite3.Error as e:
+            print(f"Ошибка сохранения пользователей: {e}")
+            return False
+
+    def get(self, login):
+        row = self.conn.execute(
+            f'SELECT {self.COLUMNS} FROM users WHERE login = ?', (login,)
+        ).fetchone()
+        return self.row_to_record(row) if row else None
+
+    def exists(self, login):
+        return self.conn.execute('SELECT 1 FROM users WHERE login = ?', (login,)).fetchone() is not None
+
+    def find_login(self, login):
+        row = self.conn.execute(
+            'SELECT login FROM users WHERE login_key = ? ORDER BY login = ? DESC LIMIT 1',
+            (login_key(login), login)
+        ).fetchone()
+        return row[0] if row else None
+
+    def find_email(self, email):
+        row = self.conn.execute(
+            'SELECT login FROM users WHERE email_key = ? ORDER BY rowid LIMIT 1', (email_key(email),)
+        ).fetchone()
+        return row[0] if row else None
+
+    def add(self, login, record):
+        try:
+            with self.conn:
+                self.conn.execute(f'INSERT {self.INSERT_INTO}', self.record_to_row(login, record))
+            return True
+        except sqlite3.Error as e:
+            print(f"Ошибка сохранения пользователей: {e}")
+            return False
+
+    def record_result(self, login, result):
+        # в правой части UPDATE используются значения до изменения строки
+        win = 1 if result == 'win' else 0
+        loss = 1 if result == 'loss' else 0
+        try:
+            with self.conn:
+                cursor = self.conn.execute(
+                    '''UPDATE users
+                       SET games = games + 1,
+                           wins = wins + ?,
+                           losses = losses + ?,
+                           winrate = (wins + ?) * 1.0 / (games + 1) * 100
+                       WHERE login = ?''',
+                    (win, loss, win, login)
+                )
+            return cursor.rowcount == 1
+        except sqlite3.Error as e:
+            print(f"Ошибка сохранения пользователей: {e}")
+            return False
+
+    def set_password(self, login, password_hash):
+        try:
+            with self.conn:
+                cursor = self.conn.execute(
+                    'UPDATE users SET password = ? WHERE login = ?', (password_hash, login)
+                )
+            return cursor.rowcount == 1
+        except sqlite3.Error as e:
+            print(f"Ошибка сохранения пользователей: {e}")
+            return False
+
+    def leaderboard(self, offset=0, limit=None, sort_by='wins'):
+        check_sort_key(sort_by)
+
+        # LIMIT -1 в sqlite означает "без ограничения"
+        rows = self.conn.execute(
+            f'SELECT login, games, wins, losses, winrate FROM users ORDER BY {sort_by} DESC, login LIMIT ? OFFSET ?',
+            (-1 if limit is None else limit, offset)
+        )
+        return [
+            {'login': login, 'games': games, 'wins': wins, 'losses': losses, 'winrate': winrate}
+            for login, games, wins, losses, winrate in rows
+        ]
+
+    def search(self, prefix, offset=0, limit=None):
+        # диапазон по индексу ключа логина; общее место в рейтинге здесь не считается (rank = None)
+        key = login_key(prefix)
+        rows = self.conn.execute(
+            '''SELECT login, games, wins, losses, winrate FROM users
+               WHERE login_key >= ? AND login_key < ?
+               ORDER BY wins DESC, login LIMIT ? OFFSET ?''',
+            (key, key + PREFIX_END, -1 if limit is None else limit, offset)
+        )
+        return [
+            {'login': login, 'games': games, 'wins': wins, 'losses': losses, 'winrate': winrate, 'rank': None}
+            for login, games, wins, losses, winrate in rows
+        ]
+
+    def search_count(self, prefix):
+        key = login_key(prefix)
+        return self.conn.execute(
+            'SELECT COUNT(*) FROM users WHERE login_key >= ? AND login_key < ?', (key, key + PREFIX_END)
+        ).fetchone()[0]
+
+    def count(self):
+        return self.conn.execute('SELECT COUNT(*) FROM users').fetchone()[0]
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    @staticmethod
+    def record_to_row(login, record):
+        # раскладываем вложенную запись json в колонки таблицы
+        stats = record.get('stats', {})
+        games = stats.get('games', 0)
+        wins = stats.get('wins', 0)
+        return (
+            login,
+            record['password'],
+            record['email'],
+            record.get('gender'),
+            record.get('age_category'),
+            record.get('created_at'),
+            games,
+            wins,
+            stats.get('losses', 0),
+            (wins / games * 100) if games > 0 else 0.0,
+            login_key(login),
+            email_key(record['email'])
+        )
+
+    @staticmethod
+    def row_to_record(row):
+        # собираем запись в том же виде, что хранится в users.json
+        _, password, email, gender, age_category, created_at, games, wins, losses, _ = row
+        return {
+            'password': password,
+            'email': email,
+            'gender': gender,
+            'age_category': age_category,
+            'stats': {
+                'games': games,
+                'wins': wins,
+                'losses': losses
+            },
+            'created_at': created_at
+        }
+
+
+def is_sqlite_path(path):
+    # база sqlite определяется по расширению файла
+    return path is not None and os.path.splitext(path)[1].lower() in SQLITE_EXTENSIONS
+
+
+def create_storage(users_file, mode, journal_suffix='.journal', compact_threshold=500,
+                   write_behind=False, write_delay=0.5, shards=16, max_loaded_shards=4, extension='.json'):
+    # выбираем реализацию хранилища по режиму из конфигурации
+    if mode == 'sqlite':
+        return SqliteStorage(users_file)
+    if mode == 'sharded':
+        return ShardedStorage(
+            users_file,
+            shards=shards,
+            max_loaded=max_loaded_shards,
+            extension=extension,
+            write_behind=write_behind,
+            write_delay=write_delay
+        )
+    if mode in ('json', 'journal'):
+        return JsonStorage(
+            users_file,
+            journal=(mode == 'journal'),
+            journal_suffix=journal_suffix,
+            compact_threshold=compact_threshold,
+            write_behind=write_behind,
+            write_delay=write_delay
+        )
+    raise ValueError(f"Неизвестный режим хранения: {mode}")
+
+
+def read_with_journal(users_file, journal_suffix='.journal'):
+    # пользователи из файла вместе с записями журнала; журнал только читаем,
+    # исходные файлы остаются нетронутыми
+    users = {}
+    if os.path.exists(users_file):
+        users = read_users_file(users_file)
+    StatsJournal(users_file, suffix=journal_suffix).replay(users)
+    return users
+
+
+def migrate_to_shards(json_file, shard_dir, shards=16, extension='.json', journal_suffix='.journal'):
+    """
+    Однократно раскладывает пользователей из users.json (вместе с журналом)
+    по шардам. Возвращает количество перенесенных записей.
+    """
+    users = read_with_journal(json_file, journal_suffix)
+
+    target = ShardedStorage(shard_dir, shards=shards, max_loaded=shards, extension=extension)
+    target.load()
+    for login, record in users.items():
+        n = target.shard_of(login)
+        target.shard(n)[login] = record
+        target.login_keys[n].setdefault(login_key(login), login)
+        target.index_email(login, record)
+        target.counts[n] += 1
+        target.dirty.add(n)
+    target.counts_dirty = True
+    target.close()
+    return len(users)
+
+
+def migrate_json_to_sqlite(json_file, db_file, journal_suffix='.journal'):
+    """
+    Однократно переносит пользователей из users.json (вместе с журналом,
+    если он есть) в базу sqlite. Существующие логины в базе не перезаписываются.
+    Возвращает количество перенесенных записей.
+    """
+    users = read_with_journal(json_file, journal_suffix)
+
+    target = SqliteStorage(db_file)
+    target.load()
+    try:
+        with target.conn:
+            cursor = target.conn.executemany(
+                f'INSERT OR IGNORE {SqliteStorage.INSERT_INTO}',
+                (SqliteStorage.record_to_row(login, record) for login, record in users.items())
+            )
+        return cursor.rowcount
+    finally:
+        target.close()
+
+
+def main():
+    # python storage.py users.json users.db - перенос данных в sqlite
+    if len(sys.argv) != 3:
+        print("Использование: python storage.py <users.json> <users.db>")
+        return 1
+
+    count = migrate_json_to_sqlite(sys.argv[1], sys.argv[2])
+    print(f"Перенесено пользователей: {count}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
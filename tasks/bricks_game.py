@@ -1,17 +1,19 @@
 # модуль описывает игру "кирпичи" с интерфейсом customtkinter
 import customtkinter as ctk
-import random
 import json
 import os
 import math
 from datetime import datetime
 from pathlib import Path
-from config import COLORS, FONTS, WINDOW_SIZES, BRICKS_GAME, SIZES, get_base_dir
+from config import COLORS, FONTS, WINDOW_SIZES, BRICKS_GAME, SIZES, HISTORY, get_base_dir
+from engine import AI, PLAYER, BricksEngine, GameListener, MoveHistory
 from utils import IconLoader
+from widgets import BrickWallRenderer, HistoryView, ToastManager
+from timers import TimerRegistry
 
 
-class BricksGameTask(ctk.CTkToplevel):
-    # окно запускает игру "кирпичи" и управляет ее состоянием
+class BricksGameTask(ctk.CTkToplevel, GameListener):
+    # окно запускает игру "кирпичи" и отображает состояние движка
     def __init__(self, parent):
         super().__init__(parent)
         
@@ -33,17 +35,19 @@ class BricksGameTask(ctk.CTkToplevel):
         self.geometry(f"{width}x{height}+{x}+{y}")
         self.configure(fg_color=COLORS['bg_primary'])
         
-        # создаем игровые переменные и параметры отображения стены
-        self.bricks_left = 0
-        self.current_turn = "player"
-        self.game_active = False
+        # правила и состояние партии хранит движок, окно подписано на его события
+        self.engine = BricksEngine(BRICKS_GAME, listener=self)
+        
+        # отложенные вызовы окна (ход AI, уведомления) отменяются при закрытии
+        self.timers = TimerRegistry(self)
+        self.toasts = ToastManager(self, self.timers, rely=0.05)
         
         # подгружаем накопленную статистику
         self.stats_file = self.get_stats_file_path()
         self.stats = self.load_stats()
         
-        # инициализируем историю ходов и параметры кирпичей
-        self.move_history = []
+        # инициализируем историю ходов (кольцевой буфер) и параметры кирпичей
+        self.move_history = MoveHistory(HISTORY['capacity'])
         self.brick_size = (36, 36)
         self.brick_icon = IconLoader.load_icon('brick', size=self.brick_size)
         self.bricks_per_row = 8
@@ -61,6 +65,23 @@ class BricksGameTask(ctk.CTkToplevel):
         except Exception:
             pass
     
+    @property
+    def bricks_left(self):
+        return self.engine.state.bricks_left
+    
+    @property
+    def current_turn(self):
+        return self.engine.state.turn
+    
+    @property
+    def game_active(self):
+        return self.engine.state.active
+    
+    def destroy(self):
+        # при закрытии окна отменяем ход AI и скрытие уведомлений
+        self.timers.cancel_all()
+        super().destroy()
+    
     def create_widgets(self):
         # формируем основной контейнер окна и размещаем секции
         main_frame = ctk.CTkFrame(
@@ -113,12 +134,24 @@ class BricksGameTask(ctk.CTkToplevel):
         
         rules_label = ctk.CTkLabel(
             header_frame,
-            text="Забирайте от 1 до 3 кирпичей. Кто не может сделать ход - проиграл!",
+            text=self.describe_rules(),
             font=FONTS['body_md'],
             text_color=COLORS['text_muted']
         )
         rules_label.pack(anchor="w", pady=(4, 0))
         
+    def describe_rules(self):
+        # краткое описание правил для заголовка окна
+        moves = self.engine.moves
+        if moves == tuple(range(moves[0], moves[-1] + 1)):
+            take_text = f"Забирайте от {moves[0]} до {moves[-1]} кирпичей."
+        else:
+            take_text = f"Разрешено забирать: {', '.join(map(str, moves))} кирпичей."
+        
+        if self.engine.rules.misere:
+            return f"{take_text} Кто взял последний кирпич - проиграл!"
+        return f"{take_text} Кто не может сделать ход - проиграл!"
+        
     def create_game_panel(self, parent):
         # игровая панель содержит стену кирпичей и элементы хода
         game_panel = ctk.CTkFrame(
@@ -162,6 +195,13 @@ class BricksGameTask(ctk.CTkToplevel):
             text_color=COLORS['text_muted']
         )
         self.bricks_label.pack(pady=(0, SIZES['padding_sm']))
+        
+        self.brick_wall = BrickWallRenderer(
+            self.bricks_wall_container,
+            self.brick_icon,
+            per_row=self.bricks_per_row,
+            max_rows=self.max_brick_rows
+        )
         self.render_brick_wall()
         
         # текстовый индикатор показывает, чей сейчас ход
@@ -199,10 +239,10 @@ class BricksGameTask(ctk.CTkToplevel):
         btn_container.pack()
         
         self.move_buttons = []
-        for i in range(1, 4):
+        for i in self.engine.moves:
             btn = ctk.CTkButton(
                 btn_container,
-                text=f"{i} кирпич" + ("а" if i == 2 else "ей" if i == 3 else ""),
+                text=f"{i} {self.get_brick_suffix(i)}",
                 font=FONTS['body_lg'],
                 width=150,
                 height=SIZES['button_height_lg'],
@@ -335,6 +375,7 @@ class BricksGameTask(ctk.CTkToplevel):
             state="disabled"
         )
         self.history_text.pack(fill="both", expand=True)
+        self.history_view = HistoryView(self.history_text, HISTORY['max_lines'])
         
     def create_control_panel(self, parent):
         # нижняя панель объединяет кнопки запуска игры и сохранения
@@ -395,79 +436,55 @@ class BricksGameTask(ctk.CTkToplevel):
         if self.game_active:
             return
         
-        self.bricks_left = random.randint(BRICKS_GAME['min_bricks'], BRICKS_GAME['max_bricks'])
-        self.current_turn = "player"
-        self.game_active = True
-        self.move_history = []
-        self.apply_button_state(self.new_game_btn, False)
-        
-        self.update_bricks_display()
-        self.update_turn_display()
-        self.update_move_buttons()
-        self.clear_history()
-        
-        text = f"Новая игра! Кирпичей: {self.bricks_left}"
-        self.add_to_history(text)
+        self.engine.new_game()
         
     def player_move(self, amount):
-        # обрабатываем выбор игрока и валидируем количество кирпичей
-        if not self.game_active or self.current_turn != "player":
-            return
-        
-        if amount > self.bricks_left:
-            self.show_message("Нельзя взять больше кирпичей, чем осталось!", "error")
-            return
+        # передаем выбор игрока движку, он же валидирует количество кирпичей
+        self.engine.player_move(amount)
         
-        self.bricks_left -= amount
-        self.add_to_history(f"Игрок взял {amount} {self.get_brick_suffix(amount)}")
+    def ai_move(self):
+        # выполняем ход компьютера после небольшой задержки
+        self.engine.ai_move()
+    
+    def on_new_game(self, state):
+        # движок начал партию: открываем ее в истории и обновляем интерфейс
+        self.move_history.start_game(state.bricks_left)
+        self.apply_button_state(self.new_game_btn, False)
         
         self.update_bricks_display()
-        
-        if self.bricks_left == 0:
-            self.end_game("ai")
-            return
-        
-        self.current_turn = "ai"
         self.update_turn_display()
         self.update_move_buttons()
+        self.clear_history()
         
-        self.after(1000, self.ai_move)
-        
-    def ai_move(self):
-        # выполняем ход компьютера после небольшой задержки
-        if not self.game_active or self.current_turn != "ai":
-            return
-        
-        amount = self.calculate_ai_move()
-        
-        self.bricks_left -= amount
-        self.add_to_history(f"AI взял {amount} {self.get_brick_suffix(amount)}")
+        text = f"Новая игра! Кирпичей: {state.bricks_left}"
+        self.add_to_history(text)
+    
+    def on_move(self, state, who, amount):
+        # записываем ход в историю и перерисовываем стену
+        self.move_history.record_move(who, amount, state.bricks_left)
+        name = "Игрок" if who == PLAYER else "AI"
+        self.add_to_history(f"{name} взял {amount} {self.get_brick_suffix(amount)}")
         
         self.update_bricks_display()
-        
-        if self.bricks_left == 0:
-            self.end_game("player")
-            return
-        
-        self.current_turn = "player"
+    
+    def on_invalid_move(self, state, amount):
+        self.show_message("Нельзя взять больше кирпичей, чем осталось!", "error")
+    
+    def on_turn(self, state):
+        # передаем ход и, если очередь ai, планируем его ход
         self.update_turn_display()
         self.update_move_buttons()
         
-    def calculate_ai_move(self):
-        # выбираем допустимое количество кирпичей для хода ai
-        if self.bricks_left <= BRICKS_GAME['max_take']:
-            return self.bricks_left
-        
-        max_take = min(BRICKS_GAME['max_take'], self.bricks_left)
-        return random.randint(BRICKS_GAME['min_take'], max_take)
+        if state.turn == AI:
+            self.timers.after(1000, self.ai_move, key='ai_move', replace=False)
         
-    def end_game(self, loser):
+    def on_game_over(self, state, loser):
         # фиксируем результат партии и обновляем статистику
-        self.game_active = False
+        self.move_history.record_result(loser)
         self.update_move_buttons()
         self.apply_button_state(self.new_game_btn, True)
         
-        if loser == "player":
+        if loser == PLAYER:
             self.stats['losses'] += 1
             cross_icon, _ = IconLoader.get_text_with_icon('cross', '', size=(16, 16))
             self.add_to_history(f"\n{'✗' if cross_icon is None else ''} Вы проиграли! Победил AI")
@@ -497,81 +514,8 @@ class BricksGameTask(ctk.CTkToplevel):
             )
     
     def render_brick_wall(self):
-        # строим сетку кирпичей и центрируем ее внутри контейнера
-        for child in self.bricks_wall_container.winfo_children():
-            child.destroy()
-
-        if not self.game_active or self.bricks_left == 0:
-            placeholder = ctk.CTkLabel(
-                self.bricks_wall_container,
-                text="Стена появится после начала игры",
-                font=FONTS['body_md'],
-                text_color=COLORS['text_muted']
-            )
-            placeholder.place(relx=0.5, rely=0.5, anchor="center")
-            return
-
-        bricks_capacity = self.bricks_per_row * self.max_brick_rows
-        bricks_to_show = min(self.bricks_left, bricks_capacity)
-
-        full_rows, remainder = divmod(bricks_to_show, self.bricks_per_row)
-        total_rows = full_rows + (1 if remainder else 0)
-        total_rows = min(total_rows, self.max_brick_rows)
-
-        row_counts = []
-        if remainder and len(row_counts) < self.max_brick_rows:
-            row_counts.append(remainder)
-        for _ in range(full_rows):
-            if len(row_counts) >= self.max_brick_rows:
-                break
-            row_counts.append(self.bricks_per_row)
-
-        # добавляем дополнительные полные ряды, чтобы стена не смещалась
-        while len(row_counts) < self.max_brick_rows and self.bricks_left >= bricks_capacity:
-            row_counts.append(self.bricks_per_row)
-
-        wall_content = ctk.CTkFrame(self.bricks_wall_container, fg_color="transparent")
-        wall_content.place(relx=0.5, rely=0.5, anchor="center")
-
-        for bricks_in_row in row_counts:
-            row_frame = ctk.CTkFrame(
-                wall_content,
-                fg_color="transparent"
-            )
-            row_frame.pack(anchor="center", pady=2)
-            inner_row = ctk.CTkFrame(
-                row_frame,
-                fg_color="transparent"
-            )
-            inner_row.pack()
-
-            for _ in range(bricks_in_row):
-                brick_widget = self.create_brick_widget(inner_row)
-                brick_widget.pack(side="left", padx=2, pady=1)
-
-        if self.bricks_left > bricks_to_show:
-            more_label = ctk.CTkLabel(
-                wall_content,
-                text=f"+ ещё {self.bricks_left - bricks_to_show}",
-                font=FONTS['body_sm'],
-                text_color=COLORS['text_secondary']
-            )
-            more_label.pack(pady=(SIZES['padding_xs'], 0))
-
-    def create_brick_widget(self, parent):
-        # возвращаем виджет кирпича, используя svg или emoji
-        if isinstance(self.brick_icon, str):
-            return ctk.CTkLabel(
-                parent,
-                text=self.brick_icon,
-                font=FONTS['heading_md'],
-                text_color=COLORS['warning']
-            )
-        return ctk.CTkLabel(
-            parent,
-            text="",
-            image=self.brick_icon
-        )
+        # перестраиваем стену только в тех рядах, где изменилось число кирпичей
+        self.brick_wall.render(self.bricks_left, self.game_active)
     
     def update_turn_display(self):
         # выводим информацию о текущем игроке или ai
@@ -598,8 +542,8 @@ class BricksGameTask(ctk.CTkToplevel):
     def update_move_buttons(self):
         # включаем доступные кнопки в зависимости от количества кирпичей
         if self.game_active and self.current_turn == "player":
-            for i, btn in enumerate(self.move_buttons, 1):
-                if i <= self.bricks_left:
+            for i, btn in zip(self.engine.moves, self.move_buttons):
+                if self.engine.can_take(i):
                     self.apply_button_state(btn, True)
                 else:
                     self.apply_button_state(btn, False)
@@ -621,17 +565,13 @@ class BricksGameTask(ctk.CTkToplevel):
         )
     
     def add_to_history(self, text):
-        # добавляем новую запись в текстовую историю
-        self.history_text.configure(state="normal")
-        self.history_text.insert("end", text + "\n")
-        self.history_text.see("end")
-        self.history_text.configure(state="disabled")
+        # добавляем запись в историю; строки одной серии событий вставляются разом
+        self.history_view.append(text)
+        self.timers.after_idle(self.history_view.flush, key='history')
         
     def clear_history(self):
         # очищаем текстовое поле истории
-        self.history_text.configure(state="normal")
-        self.history_text.delete("1.0", "end")
-        self.history_text.configure(state="disabled")
+        self.history_view.clear()
     
     def update_stats_display(self):
         # перерисовываем значения статистики и процент побед
@@ -689,27 +629,8 @@ class BricksGameTask(ctk.CTkToplevel):
             self.show_message(f"Ошибка сохранения: {e}", "error")
     
     def show_message(self, text, msg_type="info"):
-        # рисуем временное уведомление в верхней части окна
-        color_map = {
-            "success": COLORS['success'],
-            "error": COLORS['error'],
-            "info": COLORS['info'],
-            "warning": COLORS['warning']
-        }
-        
-        notification = ctk.CTkLabel(
-            self,
-            text=text,
-            font=FONTS['body_md'],
-            fg_color=color_map.get(msg_type, COLORS['info']),
-            text_color="white",
-            corner_radius=SIZES['border_radius_sm'],
-            width=300,
-            height=50
-        )
-        notification.place(relx=0.5, rely=0.05, anchor="center")
-        
-        self.after(2000, notification.destroy)
+        # временное уведомление в верхней части окна (из общего пула)
+        self.toasts.show(text, msg_type)
     
     def get_brick_suffix(self, amount):
         # подбираем окончание в зависимости от количества кирпичей
@@ -0,0 +1,132 @@
+# проверки хранилищ пользователей: точная статистика после отложенной записи, смена режима и поиск в шардах
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import JsonStorage, ShardedStorage, SqliteStorage
+
+
+def new_user():
+    return {'password': 'x', 'email': 'alice@example.com', 'stats': {'games': 0, 'wins': 0, 'losses': 0}}
+
+
+def play(users_file, compact_threshold=500):
+    # регистрация и три результата попадают в очередь до того, как фоновый поток ее запишет
+    storage = JsonStorage(users_file, journal=True, compact_threshold=compact_threshold,
+                          write_behind=True, write_delay=60)
+    storage.load()
+    storage.add('Alice', new_user())
+    for result in ('win', 'win', 'loss'):
+        storage.record_result('Alice', result)
+    storage.flush()
+    storage.close()
+
+
+def reopen(users_file):
+    storage = JsonStorage(users_file, journal=True)
+    storage.load()
+    stats = storage.get('Alice')['stats']
+    storage.close()
+    return stats
+
+
+def test_results_before_flush_are_counted_once(tmp_path):
+    users_file = str(tmp_path / 'users.json')
+    play(users_file)
+    assert reopen(users_file) == {'games': 3, 'wins': 2, 'losses': 1}
+
+
+def test_compaction_writes_exact_stats(tmp_path):
+    # при маленьком пороге поток записи сразу сворачивает журнал в снапшот
+    users_file = str(tmp_path / 'users.json')
+    play(users_file, compact_threshold=2)
+
+    with open(users_file, 'r', encoding='utf-8') as f:
+        snapshot = json.load(f)
+    assert snapshot['Alice']['stats'] == {'games': 3, 'wins': 2, 'losses': 1}
+    assert reopen(users_file) == {'games': 3, 'wins': 2, 'losses': 1}
+
+
+def test_sharded_email_lookup_reads_one_index_file(tmp_path):
+    shard_dir = str(tmp_path / 'shards')
+    storage = ShardedStorage(shard_dir, shards=8, max_loaded=2)
+    storage.load()
+    for i in range(50):
+        storage.add(f'user{i}', dict(new_user(), email=f'User{i}@Example.com'))
+    storage.close()
+
+    storage = ShardedStorage(shard_dir, shards=8, max_loaded=2)
+    storage.load()
+    assert storage.find_email(' user7@example.COM') == 'user7'
+    assert storage.find_email('nobody@example.com') is None
+    # пользовательские шарды при этом не читаются
+    assert not storage.loaded
+    storage.close()
+
+
+def test_journal_snapshot_opens_in_json_mode(tmp_path):
+    # снапшот режима журнала содержит служебную запись _meta
+    users_file = str(tmp_path / 'users.json')
+    storage = JsonStorage(users_file, journal=True)
+    storage.load()
+    storage.add('Alice', new_user())
+    storage.record_result('Alice', 'win')
+    storage.save()
+    storage.close()
+
+    storage = JsonStorage(users_file)
+    storage.load()
+    assert storage.count() == 1
+    assert storage.get('Alice')['stats'] == {'games': 1, 'wins': 1, 'losses': 0}
+    assert [row['login'] for row in storage.leaderboard()] == ['Alice']
+    storage.close()
+
+
+def test_sharded_login_lookup_ignores_case(tmp_path):
+    shard_dir = str(tmp_path / 'shards')
+    storage = ShardedStorage(shard_dir, shards=4, max_loaded=1)
+    storage.load()
+    for i in range(20):
+        storage.add(f'User{i}', dict(new_user(), email=f'user{i}@example.com'))
+    assert storage.find_login('USER3') == 'User3'
+    storage.close()
+
+    # после перезапуска шарды читаются заново, индекс логинов строится при загрузке шарда
+    storage = ShardedStorage(shard_dir, shards=4, max_loaded=1)
+    storage.load()
+    assert storage.find_login('user15') == 'User15'
+    assert storage.find_login('User15') == 'User15'
+    assert storage.find_login('nobody') is None
+    storage.close()
+
+
+def test_unknown_sort_key_raises_value_error(tmp_path):
+    storages = [
+        JsonStorage(str(tmp_path / 'users.json')),
+        ShardedStorage(str(tmp_path / 'shards')),
+        SqliteStorage(str(tmp_path / 'users.db')),
+    ]
+    for storage in storages:
+        storage.load()
+        storage.add('Alice', new_user())
+        assert storage.leaderboard(sort_by='games')[0]['login'] == 'Alice'
+        with pytest.raises(ValueError):
+            storage.leaderboard(sort_by='losses')
+        storage.close()
+
+
+def test_password_change_keeps_leaderboard_version(tmp_path):
+    # перехеширование пароля не должно сбрасывать кэш страниц таблицы лидеров
+    storage = JsonStorage(str(tmp_path / 'users.json'))
+    storage.load()
+    storage.add('Alice', new_user())
+    version = storage.ranking.version
+    storage.set_password('Alice', 'new-hash')
+    assert storage.ranking.version == version
+    storage.record_result('Alice', 'win')
+    assert storage.ranking.version != version
+    storage.close()
@@ -0,0 +1,88 @@
+# модуль ведет учет отложенных вызовов after() экрана, чтобы их можно было отменить разом
+import itertools
+
+
+class TimerRegistry:
+    """
+    Все таймеры экрана проходят через реестр: при уничтожении экрана
+    или сбросе сессии они отменяются одним вызовом cancel_all().
+    Таймер с ключом key существует в одном экземпляре: повторный вызов
+    либо перезапускает его (replace=True, как при задержке поиска),
+    либо оставляет уже запланированный (replace=False).
+    """
+    def __init__(self, widget):
+        self.widget = widget
+        # ключ -> идентификатор after; анонимным таймерам выдаются свои ключи
+        self.jobs = {}
+        self._anonymous = itertools.count()
+
+        self.scheduled = 0
+        self.fired = 0
+        self.cancelled = 0
+        self.deduped = 0
+
+    def after(self, delay, callback, key=None, replace=True):
+        # планируем callback через delay мс; возвращаем ключ таймера
+        return self._schedule(key, replace, callback, lambda run: self.widget.after(delay, run))
+
+    def after_idle(self, callback, key=None, replace=False):
+        # то же в ближайшее свободное время цикла tk
+        return self._schedule(key, replace, callback, self.widget.after_idle)
+
+    def _schedule(self, key, replace, callback, schedule):
+        if key is None:
+            key = ('anonymous', next(self._anonymous))
+        elif key in self.jobs:
+            if not replace:
+                self.deduped += 1
+                return key
+            self.cancel(key)
+            self.deduped += 1
+
+        def run():
+            # к моменту вызова таймер уже не считается ожидающим, поэтому callback может запланировать его снова
+            if self.jobs.pop(key, None) is None:
+                return
+            self.fired += 1
+            callback()
+
+        self.jobs[key] = schedule(run)
+        self.scheduled += 1
+        return key
+
+    def pending(self, key):
+        return key in self.jobs
+
+    def cancel(self, key):
+        job = self.jobs.pop(key, None)
+        if job is None:
+            return False
+        try:
+            self.widget.after_cancel(job)
+        except Exception:
+            # виджет уже уничтожен вместе со своими таймерами
+            pass
+        self.cancelled += 1
+        return True
+
+    def cancel_all(self):
+        for key in list(self.jobs):
+            self.cancel(key)
+
+    def __len__(self):
+        return len(self.jobs)
+
+    def stats(self):
+        # счетчики для диагностики: ожидающие таймеры по ключам и итоги
+        by_key = {}
+        for key in self.jobs:
+            name = key[0] if isinstance(key, tuple) else key
+            by_key[name] = by_key.get(name, 0) + 1
+        return {
+            'pending': len(self.jobs),
+            'by_key': by_key,
+            'scheduled': self.scheduled,
+            'fired': self.fired,
+            'cancelled': self.cancelled,
+            'deduped': self.deduped
+        }
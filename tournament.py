@@ -0,0 +1,134 @@
+# модуль проводит турнир стратегий ai в пуле процессов с воспроизводимыми сидами
+import os
+import sys
+import json
+import time
+import random
+import argparse
+from multiprocessing import Pool
+from config import BRICKS_GAME
+from engine import Rules, play_out
+from ai import STRATEGIES
+
+
+# число задач на пару и размер не зависит от числа процессов,
+# поэтому результат воспроизводим при любом --workers
+DEFAULT_CHUNKS = 16
+
+# стратегии создаются один раз на процесс-воркер
+_WORKER_STRATEGIES = {}
+
+
+def task_seed(master_seed, first, second, start, chunk):
+    # сид задачи зависит только от ее параметров, а не от того, какой воркер ее взял
+    return f"{master_seed}:{first}:{second}:{start}:{chunk}"
+
+
+def get_strategy(name, rules):
+    strategy = _WORKER_STRATEGIES.get((name, rules))
+    if strategy is None:
+        strategy = _WORKER_STRATEGIES[(name, rules)] = STRATEGIES[name](rules)
+    return strategy
+
+
+def run_chunk(task):
+    # партии одной задачи: пара стратегий, стартовый размер и свой генератор
+    first, second, start, games, seed, moves, misere = task
+    rules = Rules(moves, misere)
+    rng = random.Random(seed)
+
+    first_choose = get_strategy(first, rules).choose
+    second_choose = get_strategy(second, rules).choose
+    first_policy = lambda bricks: first_choose(bricks, rng)
+    second_policy = lambda bricks: second_choose(bricks, rng)
+
+    wins = 0
+    for _ in range(games):
+        if play_out(start, first_policy, second_policy, rules) == 0:
+            wins += 1
+    return first, second, start, wins, games
+
+
+def make_tasks(strategies, rules, sizes, games, chunks, master_seed):
+    # делим партии каждой пары и размера на chunks независимых задач
+    tasks = []
+    for first in strategies:
+        for second in strategies:
+            for start in sizes:
+                for chunk in range(chunks):
+                    chunk_games = games // chunks + (1 if chunk < games % chunks else 0)
+                    if chunk_games:
+                        seed = task_seed(master_seed, first, second, start, chunk)
+                        tasks.append((first, second, start, chunk_games, seed, rules.moves, rules.misere))
+    return tasks
+
+
+def run_tournament(strategies, games=10000, master_seed=0, workers=None, chunks=None, rules=None):
+    """
+    Проводит турнир: каждая упорядоченная пара стратегий играет games партий
+    на каждом стартовом размере кучи. Результаты воркеров сливаются суммированием,
+    поэтому итог не зависит от числа процессов и порядка выполнения задач.
+    """
+    rules = rules or Rules.from_config()
+    workers = workers or os.cpu_count() or 1
+    chunks = chunks or DEFAULT_CHUNKS
+    sizes = range(rules.min_bricks, rules.max_bricks + 1)
+    tasks = make_tasks(strategies, rules, sizes, games, chunks, master_seed)
+
+    table = {}
+    with Pool(workers) as pool:
+        for first, second, start, wins, played in pool.imap_unordered(run_chunk, tasks):
+            cell = table.setdefault((first, second), {}).setdefault(start, [0, 0])
+            cell[0] += wins
+            cell[1] += played
+    return table
+
+
+def build_report(table, master_seed, rules, elapsed):
+    # сводный отчет: доли побед первой стратегии по размерам и в целом
+    pairs = {}
+    for (first, second), by_start in sorted(table.items()):
+        wins = sum(cell[0] for cell in by_start.values())
+        played = sum(cell[1] for cell in by_start.values())
+        pairs[f"{first}/{second}"] = {
+            'games': played,
+            'first_win_rate': wins / played if played else 0.0,
+            'by_start': {str(start): cell[0] / cell[1] for start, cell in sorted(by_start.items())}
+        }
+    return {
+        'master_seed': master_seed,
+        'rules': {'moves': list(rules.moves), 'misere': rules.misere},
+        'elapsed_sec': round(elapsed, 3),
+        'pairs': pairs
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Турнир стратегий ai для игры «Кирпичи»")
+    parser.add_argument('--strategies', nargs='+', default=list(STRATEGIES), choices=list(STRATEGIES))
+    parser.add_argument('--games', type=int, default=10000, help="партий на каждую пару и стартовый размер")
+    parser.add_argument('--seed', type=int, default=0, help="главный сид, от которого считаются сиды задач")
+    parser.add_argument('--workers', type=int, default=None, help="число процессов (по умолчанию - число ядер)")
+    parser.add_argument('--chunks', type=int, default=None, help="задач на каждую пару и размер")
+    parser.add_argument('--output', default=None, help="сохранить отчет в json-файл")
+    args = parser.parse_args(argv)
+
+    rules = Rules.from_config(BRICKS_GAME)
+    started = time.perf_counter()
+    table = run_tournament(args.strategies, args.games, args.seed, args.workers, args.chunks, rules)
+    report = build_report(table, args.seed, rules, time.perf_counter() - started)
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
+
+    for pair, data in report['pairs'].items():
+        print(f"{pair}: {data['first_win_rate']:.3f}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
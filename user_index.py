@@ -0,0 +1,40 @@
+# модуль хранит вторичные индексы пользователей: по email и по логину без учета регистра
+def login_key(login):
+    # логины сравниваются без учета регистра (casefold работает и для кириллицы)
+    return login.casefold()
+
+
+def email_key(email):
+    return email.strip().casefold()
+
+
+class UserIndex:
+    # хеш-таблицы ключ -> логин: поиск дубликатов и пользователя по email за O(1)
+    def __init__(self):
+        self._logins = {}
+        self._emails = {}
+
+    def build(self, users):
+        # строим индексы один раз при загрузке пользователей
+        self._logins = {}
+        self._emails = {}
+        for login, record in users.items():
+            self.add(login, record)
+
+    def add(self, login, record):
+        # в старых данных могут быть совпадения; индекс указывает на первую запись
+        self._logins.setdefault(login_key(login), login)
+        email = record.get('email')
+        if email:
+            self._emails.setdefault(email_key(email), login)
+
+    def find_login(self, login):
+        # логин в том написании, в каком он зарегистрирован, или None
+        return self._logins.get(login_key(login))
+
+    def find_email(self, email):
+        # логин владельца email или None
+        return self._emails.get(email_key(email))
+
+    def __len__(self):
+        return len(self._logins)
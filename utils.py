@@ -1,64 +1,304 @@
 # вспомогательный модуль для загрузки иконок и emoji
 import os
+import queue
+import hashlib
+import threading
+from io import BytesIO
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image, ImageTk
 import customtkinter as ctk
-from config import ICONS, EMOJI
+from config import ICONS, EMOJI, ICON_CACHE, get_cache_dir
+
+
+class IconDiskCache:
+    # png-файлы растеризованных svg; ключ - хеш содержимого svg, размер и масштаб
+    def __init__(self, directory):
+        self.directory = directory
+
+    def key(self, icon_name, svg_data, size, scale):
+        # имя файла меняется при любом изменении svg, поэтому устаревший png не прочитается
+        digest = hashlib.sha1(svg_data).hexdigest()[:16]
+        return f"{icon_name}_{size[0]}x{size[1]}@{scale}_{digest}.png"
+
+    def load(self, key):
+        # читаем png целиком; битый или недописанный файл считается промахом
+        path = os.path.join(self.directory, key)
+        if not os.path.exists(path):
+            return None
+        try:
+            image = Image.open(path)
+            image.load()
+            return image
+        except Exception as e:
+            print(f"Ошибка чтения кэша иконки {key}: {e}")
+            return None
+
+    def store(self, key, png_data):
+        # пишем атомарно и удаляем версии той же иконки от старого svg
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            prefix = key.rsplit('_', 1)[0] + '_'
+            for name in os.listdir(self.directory):
+                if name.startswith(prefix) and name != key:
+                    os.remove(os.path.join(self.directory, name))
+
+            path = os.path.join(self.directory, key)
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(png_data)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Ошибка записи кэша иконки {key}: {e}")
+
+
+class LruCache:
+    # кэш с бюджетом в байтах: при переполнении вытесняются давно не использованные записи
+    # (потокобезопасный - в него пишут и поток tk, и потоки прогрева иконок)
+    def __init__(self, budget):
+        self.budget = budget
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, nbytes):
+        with self._lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.size -= old[1]
+            self.entries[key] = (value, nbytes)
+            self.size += nbytes
+
+            # последнюю добавленную запись не вытесняем, даже если она больше бюджета
+            while self.size > self.budget and len(self.entries) > 1:
+                _, (_, evicted_bytes) = self.entries.popitem(last=False)
+                self.size -= evicted_bytes
+                self.evictions += 1
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self.entries
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self.size = 0
+
+    def stats(self):
+        return {
+            'entries': len(self.entries),
+            'bytes': self.size,
+            'budget': self.budget,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
+
+
+def image_bytes(image):
+    # примерный объем растра в памяти
+    return image.width * image.height * len(image.getbands())
+
+
+def tint_image(image, color):
+    # перекрашиваем одноцветную иконку: цвет заливки, прозрачность - от исходника
+    image = image.convert('RGBA')
+    tinted = Image.new('RGBA', image.size, color)
+    tinted.putalpha(image.getchannel('A'))
+    return tinted
 
 
 class IconLoader:
     # класс кэширует изображения и подставляет emoji при ошибке
-    _cache = {}
+    # в одном lru лежат готовые CTkImage и мастер-растры, из которых уменьшаются мелкие размеры
+    _cache = LruCache(ICON_CACHE['memory_budget'])
+    # счетчики меняют и потоки прогрева, поэтому под блокировкой
+    _lock = threading.Lock()
+    rasterized = 0
+    derived = 0
+    disk_cache = IconDiskCache(str(get_cache_dir() / ICON_CACHE['dir_name'])) if ICON_CACHE['enabled'] else None
     
     @staticmethod
     def load_icon(icon_name, size=(24, 24), color=None):
         # загружаем svg/png иконку или возвращаем emoji текст
-        cache_key = f"{icon_name}_{size[0]}x{size[1]}"
+        scale = ICON_CACHE['scale']
+        cache_key = (icon_name, size[0], size[1], color, scale)
         
         # если изображение уже загружено, используем кэш
-        if cache_key in IconLoader._cache:
-            return IconLoader._cache[cache_key]
+        icon = IconLoader._cache.get(cache_key)
+        if icon is not None:
+            return icon
         
-        # получаем путь к файлу и проверяем его существование
+        image = IconLoader.rasterize(icon_name, size, color)
+        if image is None:
+            return EMOJI.get(icon_name, '?')
+        return IconLoader.make_ctk_image(cache_key, image, size)
+    
+    @staticmethod
+    def rasterize(icon_name, size, color=None):
+        # готовый растр иконки или None; не трогает tk, поэтому годится для фоновых потоков
         icon_path = ICONS.get(icon_name)
         
         if icon_path and os.path.exists(icon_path):
             try:
                 # svg обрабатываем через cairosvg, иначе открываем напрямую
                 if icon_path.endswith('.svg'):
-                    try:
-                        import cairosvg
-                        from io import BytesIO
-                        
-                        png_data = cairosvg.svg2png(
-                            url=icon_path,
-                            output_width=size[0],
-                            output_height=size[1]
-                        )
-                        
-                        image = Image.open(BytesIO(png_data))
-                    except ImportError:
+                    image = IconLoader.get_raster(icon_name, icon_path, size, ICON_CACHE['scale'])
+                    if image is None:
                         # при отсутствии cairosvg отдаем emoji
-                        return EMOJI.get(icon_name, '?')
+                        return None
                 else:
                     # растровые изображения просто изменяем по размеру
                     image = Image.open(icon_path)
                     image = image.resize(size, Image.Resampling.LANCZOS)
                 
-                # создаем экземпляр CTkImage для обеих тем
-                ctk_image = ctk.CTkImage(
-                    light_image=image,
-                    dark_image=image,
-                    size=size
-                )
-                
-                IconLoader._cache[cache_key] = ctk_image
-                return ctk_image
+                if color:
+                    image = tint_image(image, color)
+                return image
                 
             except Exception as e:
                 # логируем ошибку и возвращаем emoji запасной вариант
                 print(f"Ошибка загрузки иконки {icon_name}: {e}")
         
-        return EMOJI.get(icon_name, '?')
+        return None
+    
+    @staticmethod
+    def make_ctk_image(cache_key, image, size):
+        # создаем экземпляр CTkImage для обеих тем (только в потоке tk)
+        ctk_image = ctk.CTkImage(
+            light_image=image,
+            dark_image=image,
+            size=size
+        )
+        
+        IconLoader._cache.put(cache_key, ctk_image, image_bytes(image))
+        return ctk_image
+    
+    @staticmethod
+    def prewarm(widget, icons, workers=4, on_done=None):
+        """
+        Растеризует иконки icons (список (имя, размер)) в пуле потоков.
+        Готовые растры забирает поток tk по таймеру и только там создает CTkImage,
+        так что экраны потом получают иконки из кэша без растеризации.
+        """
+        scale = ICON_CACHE['scale']
+        pending = []
+        for icon_name, size in icons:
+            cache_key = (icon_name, size[0], size[1], None, scale)
+            if icon_name not in ICONS:
+                # у иконки нет файла (только emoji) - растеризовать нечего
+                print(f"Неизвестная иконка для прогрева: {icon_name}")
+            elif cache_key not in IconLoader._cache:
+                pending.append((cache_key, icon_name, tuple(size)))
+        
+        ready = queue.Queue()
+        
+        def work(item):
+            cache_key, icon_name, size = item
+            ready.put((cache_key, size, IconLoader.rasterize(icon_name, size)))
+        
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="icon-prewarm")
+        for item in pending:
+            executor.submit(work, item)
+        executor.shutdown(wait=False)
+        
+        remaining = [len(pending)]
+        
+        def poll():
+            while True:
+                try:
+                    cache_key, size, image = ready.get_nowait()
+                except queue.Empty:
+                    break
+                remaining[0] -= 1
+                # иконку могли уже загрузить синхронно, пока шел прогрев
+                if image is not None and cache_key not in IconLoader._cache:
+                    IconLoader.make_ctk_image(cache_key, image, size)
+            
+            if remaining[0] > 0:
+                widget.after(20, poll)
+            elif on_done:
+                on_done()
+        
+        widget.after(20, poll)
+    
+    @staticmethod
+    def get_raster(icon_name, icon_path, size, scale):
+        # растр нужного размера: уменьшаем мастер, если он не меньше, иначе растеризуем svg
+        width, height = size[0] * scale, size[1] * scale
+        master_key = ('master', icon_name, scale)
+        master = IconLoader._cache.get(master_key)
+        
+        if master is not None and master.width >= width and master.height >= height \
+                and master.width * height == master.height * width:
+            with IconLoader._lock:
+                IconLoader.derived += 1
+            if master.size == (width, height):
+                return master
+            return master.resize((width, height), Image.Resampling.LANCZOS)
+        
+        image = IconLoader.load_svg(icon_name, icon_path, size)
+        if image is None:
+            return None
+        with IconLoader._lock:
+            IconLoader.rasterized += 1
+        
+        # самый крупный растр иконки становится мастером для следующих размеров
+        if master is None or image.width * image.height > master.width * master.height:
+            IconLoader._cache.put(master_key, image, image_bytes(image))
+        return image
+    
+    @staticmethod
+    def cache_stats():
+        # счетчики кэша иконок для диагностики
+        stats = IconLoader._cache.stats()
+        with IconLoader._lock:
+            stats['rasterized'] = IconLoader.rasterized
+            stats['derived'] = IconLoader.derived
+        return stats
+    
+    @staticmethod
+    def load_svg(icon_name, icon_path, size):
+        # растр svg: сначала дисковый кэш, cairosvg импортируется только при промахе
+        with open(icon_path, 'rb') as f:
+            svg_data = f.read()
+        
+        scale = ICON_CACHE['scale']
+        disk_cache = IconLoader.disk_cache
+        key = None
+        if disk_cache:
+            key = disk_cache.key(icon_name, svg_data, size, scale)
+            image = disk_cache.load(key)
+            if image is not None:
+                return image
+        
+        try:
+            import cairosvg
+        except ImportError:
+            return None
+        
+        png_data = cairosvg.svg2png(
+            bytestring=svg_data,
+            url=icon_path,
+            output_width=size[0] * scale,
+            output_height=size[1] * scale
+        )
+        if disk_cache:
+            disk_cache.store(key, png_data)
+        return Image.open(BytesIO(png_data))
     
     @staticmethod
     def get_text_with_icon(icon_name, text, size=(20, 20)):
@@ -68,4 +308,4 @@ class IconLoader:
         if isinstance(icon, str):
             return None, f"{icon} {text}"
         else:
-            return icon, text
\ No newline at end of file
+            return icon, text
@@ -0,0 +1,463 @@
+# модуль содержит переиспользуемые виджеты интерфейса
+import math
+from collections import deque
+from functools import lru_cache
+import customtkinter as ctk
+from config import COLORS, FONTS, SIZES, TOASTS
+
+
+# отметка "значение еще не выставлялось"
+_UNSET = object()
+
+
+def configure_changed(widget, **options):
+    # передаем в configure только изменившиеся значения; последние выставленные хранятся на виджете
+    last = widget.__dict__.setdefault('_last_options', {})
+    changes = {key: value for key, value in options.items() if last.get(key, _UNSET) != value}
+    if changes:
+        widget.configure(**changes)
+        last.update(changes)
+    return bool(changes)
+
+
+class VirtualTable(ctk.CTkFrame):
+    # таблица создает виджеты только для видимых строк и переиспользует их при прокрутке
+    def __init__(self, parent, columns, fetch_rows, total_rows, format_row, row_height=44, overscan=2, **kwargs):
+        super().__init__(parent, fg_color="transparent", **kwargs)
+
+        # columns - список (minsize, weight, anchor) для каждой колонки
+        self.columns = columns
+        self.fetch_rows = fetch_rows
+        self.total_rows = total_rows
+        self.format_row = format_row
+        self.row_height = row_height
+        self.overscan = overscan
+
+        # смещение прокрутки в пикселях и высота видимой области
+        self.offset = 0
+        self.viewport_height = 0
+
+        # окно уже полученных данных, чтобы не запрашивать их на каждый пиксель
+        self._window_start = 0
+        self._window_rows = []
+
+        # пул строк: каждая строка - рамка с подписями и кэшем отображаемых значений
+        self.pool = []
+
+        self.body = ctk.CTkFrame(self, fg_color="transparent")
+        self.body.pack(side="left", fill="both", expand=True)
+
+        self.scrollbar = ctk.CTkScrollbar(self, command=self.yview)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.body.bind("<Configure>", self.on_resize)
+        self.bind_scroll(self.body)
+
+    def bind_scroll(self, widget):
+        # колесо мыши: windows/macos и linux
+        widget.bind("<MouseWheel>", self.on_mousewheel)
+        widget.bind("<Button-4>", lambda e: self.yview("scroll", -1, "units"))
+        widget.bind("<Button-5>", lambda e: self.yview("scroll", 1, "units"))
+
+    def on_mousewheel(self, event):
+        self.yview("scroll", -1 if event.delta > 0 else 1, "units")
+
+    def on_resize(self, event):
+        # при изменении высоты достраиваем пул до видимых строк плюс запас;
+        # координаты строк задаются без учета масштаба, как и в place()
+        self.viewport_height = event.height / self._get_widget_scaling()
+        needed = math.ceil(self.viewport_height / self.row_height) + 1 + 2 * self.overscan
+        while len(self.pool) < needed:
+            self.pool.append(self.create_row())
+        self.scroll_to(self.offset)
+
+    def create_row(self):
+        # одна строка пула: рамка и подписи по числу колонок
+        frame = ctk.CTkFrame(self.body, fg_color="transparent", height=self.row_height)
+        frame.grid_propagate(False)
+        frame.grid_rowconfigure(0, weight=1)
+
+        cells = []
+        for col, (minsize, weight, anchor) in enumerate(self.columns):
+            frame.grid_columnconfigure(col, minsize=minsize, weight=weight)
+            label = ctk.CTkLabel(
+                frame,
+                text="",
+                font=FONTS['body_lg'],
+                corner_radius=SIZES['border_radius_sm'],
+                anchor=anchor
+            )
+            label.grid(row=0, column=col, padx=2, pady=2, sticky="nsew")
+            self.bind_scroll(label)
+            cells.append(label)
+
+        self.bind_scroll(frame)
+        # index - номер строки данных, остальное - последние выставленные значения
+        return {'frame': frame, 'cells': cells, 'index': None, 'values': None, 'texts': None, 'style': None}
+
+    def content_height(self):
+        return self.total_rows * self.row_height
+
+    def yview(self, *args):
+        # протокол прокрутки tk: moveto <доля> или scroll <n> units|pages
+        if args[0] == "moveto":
+            self.scroll_to(float(args[1]) * self.content_height())
+        elif args[0] == "scroll":
+            step = self.row_height if args[2] == "units" else self.viewport_height
+            self.scroll_to(self.offset + int(args[1]) * step)
+
+    def scroll_to(self, offset):
+        max_offset = max(0, self.content_height() - self.viewport_height)
+        self.offset = min(max(0, offset), max_offset)
+        self.redraw()
+
+    def get_rows(self, first, count):
+        # берем строки из окна данных, при промахе запрашиваем новое окно с запасом
+        end = min(first + count, self.total_rows)
+        window_end = self._window_start + len(self._window_rows)
+        if first < self._window_start or end > window_end:
+            self._window_start = max(0, first - count)
+            self._window_rows = self.fetch_rows(self._window_start, 3 * count)
+        return self._window_rows[first - self._window_start:end - self._window_start]
+
+    def redraw(self):
+        # переносим строки пула на новые позиции и перепривязываем данные
+        if not self.pool:
+            return
+
+        first = max(0, int(self.offset // self.row_height) - self.overscan)
+        rows = self.get_rows(first, len(self.pool))
+
+        for i, row in enumerate(self.pool):
+            index = first + i
+            if i >= len(rows):
+                row['frame'].place_forget()
+                row['index'] = None
+                continue
+
+            row['frame'].place(x=0, y=index * self.row_height - self.offset, relwidth=1)
+            if row['index'] != index or row['values'] != rows[i]:
+                self.bind_row(row, index, rows[i])
+
+        total = self.content_height()
+        if total > 0:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + self.viewport_height) / total))
+
+    def bind_row(self, row, index, record):
+        # обновляем подписи строки, трогая только изменившиеся свойства
+        texts, fg_color, text_color = self.format_row(index, record)
+        style = (fg_color, text_color)
+        old_texts = row['texts'] or ()
+
+        for col, label in enumerate(row['cells']):
+            changes = {}
+            if col >= len(old_texts) or old_texts[col] != texts[col]:
+                changes['text'] = texts[col]
+            if row['style'] != style:
+                changes['fg_color'] = fg_color
+                changes['text_color'] = text_color
+            if changes:
+                label.configure(**changes)
+
+        row['index'] = index
+        row['values'] = record
+        row['texts'] = texts
+        row['style'] = style
+
+    def refresh(self, total_rows=None):
+        # сбрасываем окно данных, например после изменения таблицы
+        if total_rows is not None:
+            self.total_rows = total_rows
+        self._window_start = 0
+        self._window_rows = []
+        self.scroll_to(self.offset)
+
+    def set_source(self, fetch_rows, total_rows):
+        # новый источник строк (например, результаты поиска) - показываем его с начала
+        self.fetch_rows = fetch_rows
+        self.offset = 0
+        self.refresh(total_rows)
+
+
+@lru_cache(maxsize=None)
+def wall_layout(bricks_left, per_row, max_rows):
+    # раскладка стены: число кирпичей в каждом ряду снизу вверх и остаток сверх вместимости
+    bricks_to_show = min(bricks_left, per_row * max_rows)
+    full_rows, remainder = divmod(bricks_to_show, per_row)
+
+    rows = [per_row] * full_rows
+    if remainder:
+        rows.append(remainder)
+    rows.extend([0] * (max_rows - len(rows)))
+    return tuple(rows), bricks_left - bricks_to_show
+
+
+class BrickWallRenderer:
+    # стена кирпичей с постоянным набором виджетов: ход лишь прячет или показывает кирпичи
+    def __init__(self, container, brick_icon, per_row=8, max_rows=6):
+        self.container = container
+        self.brick_icon = brick_icon
+        self.per_row = per_row
+        self.max_rows = max_rows
+
+        self.placeholder = ctk.CTkLabel(
+            container,
+            text="Стена появится после начала игры",
+            font=FONTS['body_md'],
+            text_color=COLORS['text_muted']
+        )
+
+        self.wall_content = ctk.CTkFrame(container, fg_color="transparent")
+
+        # ряды сетки нумеруются сверху, поэтому нижний ряд стены - последний
+        self.rows = []
+        for slot in range(max_rows):
+            row_frame = ctk.CTkFrame(self.wall_content, fg_color="transparent")
+            row_frame.grid(row=max_rows - 1 - slot, column=0, pady=2)
+            row_frame.grid_remove()
+            self.rows.append({'frame': row_frame, 'bricks': [], 'shown': 0})
+
+        self.more_label = ctk.CTkLabel(
+            self.wall_content,
+            text="",
+            font=FONTS['body_sm'],
+            text_color=COLORS['text_secondary']
+        )
+        self.more_text = None
+
+        # что сейчас показано в контейнере: None, 'placeholder' или 'wall'
+        self.mode = None
+
+    def render(self, bricks_left, active=True):
+        # приводим стену к нужному количеству кирпичей минимальным числом изменений
+        if not active or bricks_left == 0:
+            if self.mode != 'placeholder':
+                self.wall_content.place_forget()
+                self.placeholder.place(relx=0.5, rely=0.5, anchor="center")
+                self.mode = 'placeholder'
+            return
+
+        counts, overflow = wall_layout(bricks_left, self.per_row, self.max_rows)
+        for row, count in zip(self.rows, counts):
+            self.set_row_count(row, count)
+        self.set_overflow(overflow)
+
+        if self.mode != 'wall':
+            self.placeholder.place_forget()
+            self.wall_content.place(relx=0.5, rely=0.5, anchor="center")
+            self.mode = 'wall'
+
+    def set_row_count(self, row, count):
+        # показываем первые count кирпичей ряда, остальные скрываем
+        shown = row['shown']
+        if count == shown:
+            return
+
+        bricks = row['bricks']
+        while len(bricks) < count:
+            brick = self.create_brick_widget(row['frame'])
+            brick.grid(row=0, column=len(bricks), padx=2, pady=1)
+            brick.grid_remove()
+            bricks.append(brick)
+
+        for brick in bricks[count:shown]:
+            brick.grid_remove()
+        for brick in bricks[shown:count]:
+            brick.grid()
+
+        if count == 0:
+            row['frame'].grid_remove()
+        elif shown == 0:
+            row['frame'].grid()
+        row['shown'] = count
+
+    def set_overflow(self, overflow):
+        # подпись о кирпичах, которые не поместились в стену
+        text = f"+ ещё {overflow}" if overflow else None
+        if text == self.more_text:
+            return
+
+        if text is None:
+            self.more_label.grid_remove()
+        else:
+            self.more_label.configure(text=text)
+            self.more_label.grid(row=self.max_rows, column=0, pady=(SIZES['padding_xs'], 0))
+        self.more_text = text
+
+    def create_brick_widget(self, parent):
+        # виджет одного кирпича: svg-иконка или emoji
+        if isinstance(self.brick_icon, str):
+            return ctk.CTkLabel(
+                parent,
+                text=self.brick_icon,
+                font=FONTS['heading_md'],
+                text_color=COLORS['warning']
+            )
+        return ctk.CTkLabel(parent, text="", image=self.brick_icon)
+
+
+class HistoryView:
+    """
+    Текстовое поле истории ходов: строки копятся и вставляются в поле
+    одной операцией при flush(), а строки сверх max_lines удаляются с начала,
+    так что поле не растет без ограничения.
+    """
+    def __init__(self, textbox, max_lines=200):
+        self.textbox = textbox
+        self.max_lines = max_lines
+        self.pending = []
+        # число строк в поле (каждая запись заканчивается переводом строки)
+        self.lines = 0
+
+    def append(self, text):
+        self.pending.append(text)
+
+    def flush(self):
+        # одна вставка на все накопленные строки и одна прокрутка
+        if not self.pending:
+            return False
+        text = "".join(line + "\n" for line in self.pending)
+        self.pending = []
+
+        self.textbox.configure(state="normal")
+        self.textbox.insert("end", text)
+        self.lines += text.count("\n")
+        excess = self.lines - self.max_lines
+        if excess > 0:
+            self.textbox.delete("1.0", f"{excess + 1}.0")
+            self.lines -= excess
+        self.textbox.see("end")
+        self.textbox.configure(state="disabled")
+        return True
+
+    def clear(self):
+        self.pending = []
+        self.lines = 0
+        self.textbox.configure(state="normal")
+        self.textbox.delete("1.0", "end")
+        self.textbox.configure(state="disabled")
+
+
+class ToastManager:
+    """
+    Всплывающие уведомления на небольшом пуле переиспользуемых подписей.
+    Одновременно видно не больше max_visible уведомлений, остальные ждут в очереди
+    (при переполнении очереди отбрасываются самые старые). Повтор уже видимого
+    сообщения не создает новое уведомление, а продлевает его и показывает счетчик.
+    Скрытие планируется через реестр таймеров экрана.
+    """
+    COLOR_KEYS = {
+        "success": 'success',
+        "error": 'error',
+        "info": 'info',
+        "warning": 'warning'
+    }
+
+    def __init__(self, parent, timers, rely=0.1, max_visible=None, duration=None, max_queue=None):
+        self.parent = parent
+        self.timers = timers
+        self.rely = rely
+        self.max_visible = TOASTS['max_visible'] if max_visible is None else max_visible
+        self.duration = TOASTS['duration'] if duration is None else duration
+        self.max_queue = TOASTS['max_queue'] if max_queue is None else max_queue
+
+        # слоты: подпись (создается при первом использовании) и показанное в ней сообщение
+        self.slots = [{'label': None, 'message': None, 'repeats': 0} for _ in range(self.max_visible)]
+        self.queue = deque()
+
+        self.created = 0
+        self.shown = 0
+        self.coalesced = 0
+        self.dropped = 0
+
+    def show(self, text, msg_type="info"):
+        message = (text, msg_type)
+
+        # такое сообщение уже на экране - продлеваем его
+        for slot_index, slot in enumerate(self.slots):
+            if slot['message'] == message:
+                slot['repeats'] += 1
+                self.coalesced += 1
+                self.update_label(slot)
+                self.schedule_hide(slot_index)
+                return
+
+        # и в очереди оно уже есть - второй раз не ставим
+        if message in self.queue:
+            self.coalesced += 1
+            return
+
+        for slot_index, slot in enumerate(self.slots):
+            if slot['message'] is None:
+                self.fill_slot(slot_index, message)
+                return
+
+        self.queue.append(message)
+        if len(self.queue) > self.max_queue:
+            self.queue.popleft()
+            self.dropped += 1
+
+    def fill_slot(self, slot_index, message):
+        slot = self.slots[slot_index]
+        if slot['label'] is None:
+            slot['label'] = ctk.CTkLabel(
+                self.parent,
+                text="",
+                font=FONTS['body_md'],
+                text_color="white",
+                corner_radius=SIZES['border_radius_sm'],
+                width=300,
+                height=50
+            )
+            self.created += 1
+
+        slot['message'] = message
+        slot['repeats'] = 1
+        self.update_label(slot)
+        # слоты стоят друг под другом, первый - на прежнем месте уведомлений
+        slot['label'].place(relx=0.5, rely=self.rely, y=slot_index * 58, anchor="center")
+        slot['label'].lift()
+        self.shown += 1
+        self.schedule_hide(slot_index)
+
+    def update_label(self, slot):
+        text, msg_type = slot['message']
+        if slot['repeats'] > 1:
+            text = f"{text} (×{slot['repeats']})"
+        configure_changed(
+            slot['label'],
+            text=text,
+            fg_color=COLORS[self.COLOR_KEYS.get(msg_type, 'info')]
+        )
+
+    def schedule_hide(self, slot_index):
+        # повторный вызов для слота перезапускает его таймер
+        self.timers.after(self.duration, lambda: self.hide(slot_index), key=f'toast{slot_index}')
+
+    def hide(self, slot_index):
+        # освобождаем слот и сразу показываем в нем следующее сообщение из очереди
+        slot = self.slots[slot_index]
+        slot['message'] = None
+        slot['label'].place_forget()
+        if self.queue:
+            self.fill_slot(slot_index, self.queue.popleft())
+
+    def clear(self):
+        # прячем все уведомления и очищаем очередь (например, при смене пользователя)
+        self.queue.clear()
+        for slot_index, slot in enumerate(self.slots):
+            self.timers.cancel(f'toast{slot_index}')
+            if slot['message'] is not None:
+                slot['message'] = None
+                slot['label'].place_forget()
+
+    def stats(self):
+        # счетчики для диагностики
+        return {
+            'visible': sum(1 for slot in self.slots if slot['message'] is not None),
+            'queued': len(self.queue),
+            'created': self.created,
+            'shown': self.shown,
+            'coalesced': self.coalesced,
+            'dropped': self.dropped
+        }